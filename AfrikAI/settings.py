@@ -72,6 +72,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'AfrikAI.wsgi.application'
+ASGI_APPLICATION = 'AfrikAI.asgi.application'
 
 # -----------------------
 # Base de données
@@ -119,6 +120,33 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Rapports "stream" : taille max du buffer mémoire avant bascule sur un fichier temporaire
+REPORT_STREAM_SPOOL_MAX_SIZE = int(os.environ.get('REPORT_STREAM_SPOOL_MAX_SIZE', str(8 * 1024 * 1024)))
+
+# Profils cProfile à la demande (hors MEDIA_ROOT : non servis publiquement)
+PROFILE_ROOT = BASE_DIR / 'profiles'
+
+# -----------------------
+# Cache des données de référence (Country / RiskCategory)
+# -----------------------
+REFERENCE_CACHE_TTL = int(os.environ.get('REFERENCE_CACHE_TTL', '300'))  # secondes, 0 = pas d'expiration
+REFERENCE_CACHE_MAX_AGE = int(os.environ.get('REFERENCE_CACHE_MAX_AGE', '300'))  # Cache-Control max-age
+
+# -----------------------
+# Pré-génération des rapports / podcasts populaires (manage.py warm_reports)
+# -----------------------
+WARMUP_TOP_N = int(os.environ.get('WARMUP_TOP_N', '10'))
+WARMUP_HISTORY_DAYS = int(os.environ.get('WARMUP_HISTORY_DAYS', '30'))
+WARMUP_UPSTREAM_BUDGET = int(os.environ.get('WARMUP_UPSTREAM_BUDGET', '50'))  # appels Groq/ElevenLabs par passe
+WARMUP_MAX_AGE = int(os.environ.get('WARMUP_MAX_AGE', '86400'))  # secondes avant qu'un artefact soit régénéré
+WARMUP_OFF_PEAK_HOURS = os.environ.get('WARMUP_OFF_PEAK_HOURS', '1-6')
+WARMUP_TIMEZONE = os.environ.get('WARMUP_TIMEZONE', TIME_ZONE)  # fuseau de WARMUP_OFF_PEAK_HOURS
+
+# -----------------------
+# Export colonne RiskData / RiskForecast
+# -----------------------
+EXPORT_CHUNK_SIZE = int(os.environ.get('EXPORT_CHUNK_SIZE', '5000'))  # lignes lues par paquet
+
 # -----------------------
 # Auto field par défaut
 # -----------------------
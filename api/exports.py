@@ -0,0 +1,232 @@
+# backend/api/exports.py
+"""
+Export colonne par colonne de RiskData / RiskForecast (CSV et NumPy .npz).
+
+Les lignes sont lues via .values_list().iterator() par paquets de
+EXPORT_CHUNK_SIZE : la mémoire reste constante quelle que soit la période.
+Le .npz est lui aussi produit en flux : le nombre de lignes (pour l'en-tête
+.npy) vient d'un count(), puis chaque colonne est relue en une passe et
+écrite directement dans l'archive. Ces passes successives supposent que les
+lignes exportées ne sont pas supprimées pendant l'export (l'ajout de lignes
+est neutralisé par freeze_watermark).
+"""
+import csv
+import io
+import zipfile
+from datetime import timezone as dt_timezone
+
+from django.conf import settings
+from django.db.models import Max
+from django.utils.dateparse import parse_date, parse_datetime
+
+from . import reference_cache
+from .models import RiskData, RiskForecast
+
+# (colonne exportée, lookup values_list, dtype NumPy)
+DATASETS = {
+    "risk-data": (RiskData, [
+        ("id", "id", "int64"),
+        ("country", "country__iso_code", "<U3"),
+        ("risk_type", "risk_category__risk_type", "<U50"),
+        ("date", "date", "datetime64[D]"),
+        ("risk_level", "risk_level", "float64"),
+        ("confidence_score", "confidence_score", "float64"),
+        ("source", "source", "<U200"),
+        ("created_at", "created_at", "datetime64[us]"),
+    ], "date"),
+    "risk-forecasts": (RiskForecast, [
+        ("id", "id", "int64"),
+        ("country", "country__iso_code", "<U3"),
+        ("risk_type", "risk_category__risk_type", "<U50"),
+        ("forecast_date", "forecast_date", "datetime64[D]"),
+        ("predicted_risk_level", "predicted_risk_level", "float64"),
+        ("confidence_interval_lower", "confidence_interval_lower", "float64"),
+        ("confidence_interval_upper", "confidence_interval_upper", "float64"),
+        ("model_used", "model_used", "<U100"),
+        ("created_at", "created_at", "datetime64[us]"),
+    ], "forecast_date"),
+}
+
+FORMATS = ("csv", "npz")
+
+
+class ExportError(ValueError):
+    pass
+
+
+def build_queryset(dataset, country=None, category=None, start=None, end=None, since=None):
+    """
+    Queryset filtré et trié pour un export. Les filtres sont des chaînes
+    (paramètres HTTP ou options de commande) ; ExportError si invalides.
+    """
+    if dataset not in DATASETS:
+        raise ExportError(f"Unknown dataset '{dataset}'")
+    model, _, date_field = DATASETS[dataset]
+    queryset = model.objects.all()
+
+    # Un filtre inconnu est une erreur, pas un export vide : une faute de frappe
+    # ne doit pas passer pour "aucune donnée".
+    if country:
+        row = reference_cache.get_country(country)
+        if row is None:
+            raise ExportError(f"Unknown country '{country}'")
+        queryset = queryset.filter(country_id=row["id"])
+    if category:
+        row = reference_cache.get_risk_category(category)
+        if row is None:
+            raise ExportError(f"Unknown category '{category}'")
+        queryset = queryset.filter(risk_category_id=row["id"])
+    if start:
+        queryset = queryset.filter(**{f"{date_field}__gte": _parse_date(start, "start")})
+    if end:
+        queryset = queryset.filter(**{f"{date_field}__lte": _parse_date(end, "end")})
+    if since:
+        # Mode incrémental : uniquement les lignes créées après le dernier export
+        queryset = queryset.filter(created_at__gt=_parse_since(since))
+    return queryset.order_by("created_at", "id")
+
+
+def freeze_watermark(queryset):
+    """
+    Borne le queryset au created_at maximal courant : les lignes ajoutées
+    pendant l'export en sont exclues, et la valeur retournée (None si vide)
+    sert de `since` au prochain export incrémental.
+    """
+    last_created_at = queryset.aggregate(last=Max("created_at"))["last"]
+    if last_created_at is not None:
+        queryset = queryset.filter(created_at__lte=last_created_at)
+    return queryset, last_created_at
+
+
+def _parse_date(value, name):
+    parsed = parse_date(value)
+    if parsed is None:
+        raise ExportError(f"Invalid {name} date '{value}' (expected YYYY-MM-DD)")
+    return parsed
+
+
+def _parse_since(value):
+    parsed = parse_datetime(value)
+    if parsed is None:
+        parsed_date = parse_date(value)
+        if parsed_date is None:
+            raise ExportError(f"Invalid since '{value}' (expected an ISO 8601 datetime)")
+        parsed = parse_datetime(f"{parsed_date.isoformat()}T00:00:00")
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=dt_timezone.utc)
+    return parsed
+
+
+def iter_chunks(queryset, lookups):
+    chunk_size = settings.EXPORT_CHUNK_SIZE
+    chunk = []
+    for row in queryset.values_list(*lookups).iterator(chunk_size=chunk_size):
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# -----------------------
+# CSV
+# -----------------------
+def iter_csv(dataset, queryset):
+    """
+    Générateur de blocs CSV encodés, pour StreamingHttpResponse ou un fichier.
+    """
+    _, columns, _ = DATASETS[dataset]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow([name for name, _, _ in columns])
+    for chunk in iter_chunks(queryset, [lookup for _, lookup, _ in columns]):
+        writer.writerows(chunk)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+# -----------------------
+# NumPy .npz
+# -----------------------
+def _to_utc_naive(value):
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(dt_timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class _ZipSink(io.RawIOBase):
+    """
+    Flux non positionnable : zipfile y écrit en mode streaming (descripteurs
+    de données), et les octets produits sont récupérés par drain().
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_npz(dataset, queryset):
+    """
+    Générateur de blocs .npz (une entrée .npy par colonne), pour
+    StreamingHttpResponse ou un fichier. ExportError si le nombre de lignes
+    change entre le count() et la relecture d'une colonne.
+    """
+    import numpy as np
+    from numpy.lib import format as npy_format
+
+    _, columns, _ = DATASETS[dataset]
+    rows = queryset.count()
+    chunk_size = settings.EXPORT_CHUNK_SIZE
+    sink = _ZipSink()
+
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED, allowZip64=True) as archive:
+        for name, lookup, dtype in columns:
+            header = {"descr": npy_format.dtype_to_descr(np.dtype(dtype)),
+                      "fortran_order": False, "shape": (rows,)}
+            written = 0
+            with archive.open(f"{name}.npy", "w", force_zip64=True) as member:
+                npy_format.write_array_header_1_0(member, header)
+                values = queryset.values_list(lookup, flat=True).iterator(chunk_size=chunk_size)
+                chunk = []
+                for value in values:
+                    chunk.append(_to_utc_naive(value) if name == "created_at" else value)
+                    if len(chunk) >= chunk_size:
+                        member.write(np.asarray(chunk, dtype=dtype).tobytes())
+                        written += len(chunk)
+                        chunk = []
+                        yield sink.drain()
+                if chunk:
+                    member.write(np.asarray(chunk, dtype=dtype).tobytes())
+                    written += len(chunk)
+            if written != rows:
+                raise ExportError(f"Column '{name}' has {written} rows, expected {rows} (rows deleted during export?)")
+            yield sink.drain()
+    yield sink.drain()
+
+
+def write_npz(dataset, queryset, output):
+    """
+    Écrit le .npz dans `output` (chemin ou fichier binaire).
+    """
+    if isinstance(output, str):
+        with open(output, "wb") as f:
+            return write_npz(dataset, queryset, f)
+    for block in iter_npz(dataset, queryset):
+        output.write(block)
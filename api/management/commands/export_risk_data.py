@@ -0,0 +1,51 @@
+# backend/api/management/commands/export_risk_data.py
+from django.core.management.base import BaseCommand, CommandError
+
+from api import exports
+
+
+class Command(BaseCommand):
+    help = "Exporte RiskData / RiskForecast en CSV ou NumPy .npz, par paquets (mémoire constante)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("dataset", choices=exports.DATASETS.keys())
+        parser.add_argument("--format", choices=exports.FORMATS, default="npz")
+        parser.add_argument("--output", help="Fichier de sortie (défaut : <dataset>.<format>).")
+        parser.add_argument("--country", help="Nom ou code ISO du pays.")
+        parser.add_argument("--category", help="risk_type de la catégorie.")
+        parser.add_argument("--start", help="Date de début incluse (YYYY-MM-DD).")
+        parser.add_argument("--end", help="Date de fin incluse (YYYY-MM-DD).")
+        parser.add_argument("--since", help="Mode incrémental : lignes créées après ce created_at (ISO 8601).")
+
+    def handle(self, *args, **options):
+        dataset = options["dataset"]
+        fmt = options["format"]
+        output = options["output"] or f"{dataset}.{fmt}"
+        try:
+            queryset = exports.build_queryset(
+                dataset,
+                country=options["country"],
+                category=options["category"],
+                start=options["start"],
+                end=options["end"],
+                since=options["since"],
+            )
+        except exports.ExportError as e:
+            raise CommandError(str(e))
+
+        # Borne haute figée avant l'export : la prochaine passe --since reprend exactement ici.
+        queryset, last_created_at = exports.freeze_watermark(queryset)
+
+        if fmt == "csv":
+            with open(output, "wb") as f:
+                for block in exports.iter_csv(dataset, queryset):
+                    f.write(block)
+        else:
+            try:
+                exports.write_npz(dataset, queryset, output)
+            except exports.ExportError as e:
+                raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(f"Export écrit : {output}"))
+        if last_created_at is not None:
+            self.stdout.write(f"Prochain export incrémental : --since {last_created_at.isoformat()}")
@@ -0,0 +1,131 @@
+# backend/api/management/commands/warm_reports.py
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api import pregeneration
+
+# Coût en appels amont : 1 appel Groq par risque pour un rapport ; pour un
+# podcast, 1 appel Groq pour le script puis 1 appel ElevenLabs par segment
+# absent du cache TTS, compté une fois le script connu (voir warm_podcast).
+# Un podcast n'est tenté que s'il reste au moins de quoi payer le script et un segment.
+PODCAST_MIN_COST = 2
+
+
+class Command(BaseCommand):
+    help = (
+        "Pré-génère les rapports et podcasts les plus demandés (d'après ReportRequest) "
+        "dans la limite d'un budget d'appels amont."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top", type=int, default=settings.WARMUP_TOP_N,
+                            help="Nombre de combinaisons (pays, risques, année) à considérer.")
+        parser.add_argument("--days", type=int, default=settings.WARMUP_HISTORY_DAYS,
+                            help="Fenêtre d'historique ReportRequest, en jours.")
+        parser.add_argument("--budget", type=int, default=settings.WARMUP_UPSTREAM_BUDGET,
+                            help="Nombre maximal d'appels amont (Groq/ElevenLabs) par passe.")
+        parser.add_argument("--kinds", default="report,podcast",
+                            help="Artefacts à pré-générer : report, podcast ou les deux.")
+        parser.add_argument("--loop", action="store_true",
+                            help="Tourne en worker : une passe toutes les --interval secondes, hors pic uniquement.")
+        parser.add_argument("--interval", type=int, default=3600)
+
+    def handle(self, *args, **options):
+        kinds = {kind.strip() for kind in options["kinds"].split(",") if kind.strip()}
+        if not options["loop"]:
+            self.warm(options["top"], options["days"], options["budget"], kinds)
+            return
+
+        while True:
+            if pregeneration.in_off_peak_window():
+                # Une passe en échec (base indisponible, etc.) ne doit pas arrêter le worker
+                try:
+                    self.warm(options["top"], options["days"], options["budget"], kinds)
+                except Exception as e:
+                    self.stderr.write(f"Échec de la passe de pré-génération : {e}")
+            else:
+                self.stdout.write("Hors fenêtre creuse, passe ignorée.")
+            time.sleep(options["interval"])
+
+    def warm(self, top, days, budget, kinds):
+        """
+        Pré-génère les combinaisons les plus demandées (classées par type
+        d'artefact) tant que le budget d'appels amont le permet. Retourne le
+        nombre d'appels consommés.
+        """
+        candidates = [
+            (hits, kind, country, risks, year)
+            for kind in ("report", "podcast") if kind in kinds
+            for country, risks, year, hits in pregeneration.popular_combinations(top, days, kind)
+        ]
+        candidates.sort(key=lambda candidate: candidate[0], reverse=True)
+
+        spent = 0
+        for hits, kind, country, risks, year in candidates:
+            label = f"{country} / {', '.join(risks)} / {year} ({hits} demandes)"
+            if kind == "report":
+                cost = len(risks)
+                if spent + cost > budget or pregeneration.find_warm_report(country, risks, year):
+                    continue
+                spent += cost
+                self.warm_report(country, risks, year, label)
+            else:
+                remaining = budget - spent
+                if remaining < PODCAST_MIN_COST or pregeneration.find_warm_podcast(country, risks, year):
+                    continue
+                spent += self.warm_podcast(country, risks, year, label, remaining)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Pré-génération terminée : {spent}/{budget} appels amont utilisés."
+        ))
+        return spent
+
+    def warm_report(self, country, risks, year, label):
+        from services import report_service
+
+        try:
+            report_service.generate_report_pdf(
+                pregeneration.warm_report_path(country, risks, year), country, risks, year
+            )
+            self.stdout.write(f"Rapport pré-généré : {label}")
+        except Exception as e:
+            self.stderr.write(f"Échec rapport {label} : {e}")
+
+    def warm_podcast(self, country, risks, year, label, remaining):
+        """
+        Génère le script, puis ne lance la synthèse que si son coût réel
+        (1 appel Groq + 1 appel ElevenLabs par segment non caché) tient dans
+        `remaining`. Retourne le nombre d'appels consommés.
+        """
+        from services import podcast_generator, tts_segments
+
+        title = pregeneration.warm_podcast_title(country, risks, year)
+        try:
+            text, text_path = podcast_generator.generate_podcast_script(country, risks, year, title=title)
+        except Exception as e:
+            self.stderr.write(f"Échec podcast {label} : {e}")
+            return 1
+
+        tts_calls = podcast_generator.tts_calls_needed(text)
+        if 1 + tts_calls > remaining:
+            os.remove(text_path)
+            self.stdout.write(
+                f"Podcast ignoré (budget) : {label}, {tts_calls} segments à synthétiser "
+                f"pour {remaining - 1} appels restants"
+            )
+            return 1
+
+        try:
+            # max_calls garantit le plafond même si le cache TTS a bougé entre-temps
+            podcast_generator.synthesize_podcast(text, text_path, max_calls=tts_calls)
+            pregeneration.prune_warm_podcasts(country, risks, year)
+            self.stdout.write(f"Podcast pré-généré : {label} ({1 + tts_calls} appels)")
+        except tts_segments.TTSBudgetExceeded as e:
+            os.remove(text_path)
+            self.stdout.write(f"Podcast ignoré (budget) : {label}, {e}")
+        except Exception as e:
+            self.stderr.write(f"Échec podcast {label} : {e}")
+        return 1 + tts_calls
@@ -0,0 +1,87 @@
+# Generated by Django 5.2.6 on 2026-10-19 14:34
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Country',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('iso_code', models.CharField(max_length=3, unique=True)),
+                ('region', models.CharField(max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RiskCategory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('risk_type', models.CharField(choices=[('climate', 'Climate Change'), ('cyber', 'Cyber Security'), ('financial', 'Financial Crisis'), ('geopolitical', 'Geopolitical Tensions'), ('pandemic', 'Pandemic Outbreak'), ('supply-chain', 'Supply Chain Disruption'), ('energy', 'Energy Crisis'), ('water', 'Water Scarcity'), ('food', 'Food Security'), ('migration', 'Mass Migration'), ('terrorism', 'Terrorism'), ('natural-disaster', 'Natural Disasters'), ('economic', 'Economic Recession'), ('technology', 'Technology Disruption'), ('social', 'Social Unrest')], max_length=50, unique=True)),
+                ('description', models.TextField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ReportRequest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('forecast_horizon', models.IntegerField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('file_path', models.CharField(blank=True, max_length=500)),
+                ('error_message', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('countries', models.ManyToManyField(to='api.country')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+                ('risk_categories', models.ManyToManyField(to='api.riskcategory')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RiskData',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('risk_level', models.FloatField()),
+                ('confidence_score', models.FloatField()),
+                ('source', models.CharField(max_length=200)),
+                ('raw_data', models.JSONField(default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('country', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.country')),
+                ('risk_category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.riskcategory')),
+            ],
+            options={
+                'unique_together': {('country', 'risk_category', 'date', 'source')},
+            },
+        ),
+        migrations.CreateModel(
+            name='RiskForecast',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('forecast_date', models.DateField()),
+                ('predicted_risk_level', models.FloatField()),
+                ('confidence_interval_lower', models.FloatField()),
+                ('confidence_interval_upper', models.FloatField()),
+                ('model_used', models.CharField(max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('country', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.country')),
+                ('risk_category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.riskcategory')),
+            ],
+            options={
+                'unique_together': {('country', 'risk_category', 'forecast_date', 'model_used')},
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-19 14:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reportrequest',
+            name='country_name',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='reportrequest',
+            name='kind',
+            field=models.CharField(choices=[('report', 'Report'), ('podcast', 'Podcast')], default='report', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='reportrequest',
+            name='risks',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.6 on 2026-10-19 14:40
+
+from django.db import migrations
+
+RISK_TYPES = [
+    ('climate', 'Climate Change'),
+    ('cyber', 'Cyber Security'),
+    ('financial', 'Financial Crisis'),
+    ('geopolitical', 'Geopolitical Tensions'),
+    ('pandemic', 'Pandemic Outbreak'),
+    ('supply-chain', 'Supply Chain Disruption'),
+    ('energy', 'Energy Crisis'),
+    ('water', 'Water Scarcity'),
+    ('food', 'Food Security'),
+    ('migration', 'Mass Migration'),
+    ('terrorism', 'Terrorism'),
+    ('natural-disaster', 'Natural Disasters'),
+    ('economic', 'Economic Recession'),
+    ('technology', 'Technology Disruption'),
+    ('social', 'Social Unrest'),
+]
+
+
+def seed_risk_categories(apps, schema_editor):
+    RiskCategory = apps.get_model('api', 'RiskCategory')
+    for risk_type, label in RISK_TYPES:
+        RiskCategory.objects.get_or_create(
+            risk_type=risk_type,
+            defaults={'description': f'{label} risk category'},
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_report_request_raw_fields'),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_risk_categories, migrations.RunPython.noop),
+    ]
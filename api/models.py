@@ -73,8 +73,16 @@ class ReportRequest(models.Model):
         ('completed', 'Completed'),
         ('failed', 'Failed'),
     ]
+    KIND_CHOICES = [
+        ('report', 'Report'),
+        ('podcast', 'Podcast'),
+    ]
     
     user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, default='report')
+    # Valeurs brutes de la demande, conservées même si elles ne sont pas dans le référentiel
+    country_name = models.CharField(max_length=100, blank=True)
+    risks = models.JSONField(default=list, blank=True)
     countries = models.ManyToManyField(Country)
     risk_categories = models.ManyToManyField(RiskCategory)
     start_date = models.DateField()
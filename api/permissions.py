@@ -0,0 +1,13 @@
+# backend/api/permissions.py
+from rest_framework.permissions import SAFE_METHODS, BasePermission
+
+
+class IsAdminOrReadOnly(BasePermission):
+    """
+    Lecture pour tous, écriture réservée aux utilisateurs staff.
+    """
+
+    def has_permission(self, request, view):
+        if request.method in SAFE_METHODS:
+            return True
+        return bool(request.user and request.user.is_staff)
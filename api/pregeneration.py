@@ -0,0 +1,176 @@
+# backend/api/pregeneration.py
+"""
+Historique des demandes de rapport et pré-génération (cache warming).
+
+Chaque génération de rapport ou de podcast est enregistrée dans ReportRequest
+(champ `kind`) ; la commande `warm_reports` s'en sert pour pré-générer hors pic
+les combinaisons (pays, risques, année) les plus demandées pour chaque type. Les artefacts pré-générés sont
+rangés sous une clé stable et servis directement par les vues de génération.
+"""
+import glob
+import hashlib
+import os
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.db import DatabaseError
+from django.utils import timezone
+
+from . import reference_cache
+from .models import ReportRequest
+
+WARM_REPORT_DIR = os.path.join(settings.MEDIA_ROOT, "reports", "warm")
+WARM_PODCAST_DIR = os.path.join(settings.MEDIA_ROOT, "podcast")
+WARM_PODCAST_PREFIX = "warm"
+
+
+def normalize_combination(country: str, risks: list) -> tuple:
+    """
+    Forme canonique (pays, risques triés) : casse, espaces et ordre ignorés.
+    """
+    return country.strip().lower(), tuple(sorted(r.strip().lower() for r in risks))
+
+
+def combination_key(country: str, risks: list, year: int) -> str:
+    country, risks = normalize_combination(country, risks)
+    normalized = "|".join([country, ",".join(risks), str(year)])
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:16]
+
+
+def _is_fresh(path: str) -> bool:
+    max_age = settings.WARMUP_MAX_AGE
+    return os.path.exists(path) and (not max_age or time.time() - os.path.getmtime(path) < max_age)
+
+
+# -----------------------
+# Historique
+# -----------------------
+def record_report_request(country: str, risks: list, year: int, kind: str = "report"):
+    """
+    Enregistre la demande dans ReportRequest (statut "processing"), avec les
+    valeurs brutes ; pays et catégories sont liés quand le référentiel les connaît.
+    Retourne None si la base est indisponible.
+    """
+    try:
+        report_request = ReportRequest.objects.create(
+            kind=kind,
+            country_name=country,
+            risks=list(risks),
+            start_date=date(int(year), 1, 1),
+            end_date=date(int(year), 12, 31),
+            forecast_horizon=0,
+            status="processing",
+        )
+        country_row = reference_cache.get_country(country)
+        if country_row:
+            report_request.countries.set([country_row["id"]])
+        risk_rows = [reference_cache.get_risk_category(risk) for risk in risks]
+        report_request.risk_categories.set([row["id"] for row in risk_rows if row])
+    except DatabaseError as e:
+        print(f"Historique ReportRequest indisponible : {e}")
+        return None
+    return report_request
+
+
+def complete_report_request(report_request, file_path: str = "", error: str = ""):
+    if report_request is None:
+        return
+    report_request.status = "failed" if error else "completed"
+    report_request.file_path = file_path
+    report_request.error_message = error
+    report_request.completed_at = timezone.now()
+    try:
+        report_request.save(update_fields=["status", "file_path", "error_message", "completed_at"])
+    except DatabaseError as e:
+        print(f"Historique ReportRequest indisponible : {e}")
+
+
+def popular_combinations(top: int, days: int, kind: str = "report"):
+    """
+    Les `top` combinaisons (pays, risques, année) les plus demandées pour ce
+    type d'artefact sur les `days` derniers jours, par nombre de demandes décroissant.
+    """
+    since = timezone.now() - timedelta(days=days)
+    rows = (
+        ReportRequest.objects.filter(kind=kind, created_at__gte=since)
+        .exclude(country_name="")
+        .values_list("country_name", "risks", "start_date")
+    )
+    counter = Counter()
+    labels = {}  # forme normalisée -> première forme brute rencontrée, utilisée pour générer
+    for country, risks, start_date in rows.iterator(chunk_size=500):
+        if not risks:
+            continue
+        key = (*normalize_combination(country, risks), start_date.year)
+        counter[key] += 1
+        labels.setdefault(key, (country, sorted(risks)))
+    return [(*labels[key], key[2], hits) for key, hits in counter.most_common(top)]
+
+
+# -----------------------
+# Artefacts pré-générés
+# -----------------------
+def warm_report_path(country: str, risks: list, year: int) -> str:
+    filename = f"Rapport_Risques_{country}_{year}_{combination_key(country, risks, year)}.pdf".replace(" ", "_")
+    return os.path.join(WARM_REPORT_DIR, filename)
+
+
+def warm_report_url(file_path: str) -> str:
+    return f"/media/reports/warm/{os.path.basename(file_path)}"
+
+
+def find_warm_report(country: str, risks: list, year: int):
+    file_path = warm_report_path(country, risks, year)
+    return file_path if _is_fresh(file_path) else None
+
+
+def warm_podcast_title(country: str, risks: list, year: int) -> str:
+    return f"{WARM_PODCAST_PREFIX}_{combination_key(country, risks, year)}"
+
+
+def _warm_podcasts(country: str, risks: list, year: int) -> list[str]:
+    title = warm_podcast_title(country, risks, year)
+    return sorted(glob.glob(os.path.join(WARM_PODCAST_DIR, f"{title}_*.mp3")))
+
+
+def _podcast_text_path(mp3_path: str) -> str:
+    return os.path.join(settings.MEDIA_ROOT, "texts", os.path.basename(mp3_path)[:-4] + ".txt")
+
+
+def find_warm_podcast(country: str, risks: list, year: int):
+    """
+    Retourne (mp3_path, text_path) du dernier podcast pré-généré encore frais, sinon None.
+    """
+    candidates = _warm_podcasts(country, risks, year)
+    if not candidates or not _is_fresh(candidates[-1]):
+        return None
+    return candidates[-1], _podcast_text_path(candidates[-1])
+
+
+def prune_warm_podcasts(country: str, risks: list, year: int):
+    """
+    Supprime les anciens podcasts pré-générés (mp3 + texte) de la combinaison,
+    en ne gardant que le plus récent.
+    """
+    for mp3_path in _warm_podcasts(country, risks, year)[:-1]:
+        for path in (mp3_path, _podcast_text_path(mp3_path)):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def in_off_peak_window(now: datetime | None = None) -> bool:
+    """
+    WARMUP_OFF_PEAK_HOURS au format "1-6" (heures dans le fuseau WARMUP_TIMEZONE,
+    borne de fin exclue, la plage peut passer minuit : "22-5"). Vide = toujours autorisé.
+    """
+    window = settings.WARMUP_OFF_PEAK_HOURS
+    if not window:
+        return True
+    start, end = (int(h) for h in window.split("-"))
+    hour = timezone.localtime(now, ZoneInfo(settings.WARMUP_TIMEZONE)).hour
+    if start <= end:
+        return start <= hour < end
+    return hour >= start or hour < end
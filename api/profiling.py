@@ -0,0 +1,204 @@
+# backend/api/profiling.py
+"""
+Profilage cProfile à la demande, requête par requête.
+
+Activé par l'en-tête `X-Profile: 1` ou le paramètre `?profile=1`, uniquement
+pour un utilisateur staff authentifié par DRF (session, Basic, token...).
+Hors de ce cas, le seul coût est la lecture de l'en-tête. Le profil couvre la
+vue à partir de l'authentification et, pour une réponse en flux (FileResponse),
+l'envoi du corps bloc par bloc. Les profils (.prof, lisibles avec pstats /
+snakeviz) sont rangés dans PROFILE_ROOT et nommés d'après l'id du
+ReportRequest concerné.
+"""
+import cProfile
+import glob
+import os
+import threading
+import time
+from datetime import datetime
+
+from django.conf import settings
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_PARAM = "profile"
+PROFILE_SUFFIX = ".prof"
+
+# cProfile ne supporte qu'un profileur actif à la fois : les requêtes
+# concurrentes ne sont simplement pas profilées.
+_profiler_lock = threading.Lock()
+
+
+def profiling_requested(request) -> bool:
+    """
+    À appeler sur la requête DRF, après authentification.
+    """
+    if request.headers.get(PROFILE_HEADER) != "1" and request.GET.get(PROFILE_PARAM) != "1":
+        return False
+    user = getattr(request, "user", None)
+    return bool(user and user.is_staff)
+
+
+def make_profile_id(report_request_id, view_name: str, started_at: datetime) -> str:
+    """
+    Identifiant renvoyé dans X-Profile-Id, connu avant l'envoi du corps ; le
+    fichier y ajoute la durée totale : <id>__<durée>ms.prof.
+    """
+    return f"{report_request_id or 'none'}__{view_name}__{started_at.strftime('%Y-%m-%d_%H-%M-%S-%f')}"
+
+
+def save_profile(profiler, profile_id: str, elapsed_ms: int) -> str:
+    os.makedirs(settings.PROFILE_ROOT, exist_ok=True)
+    name = f"{profile_id}__{elapsed_ms}ms{PROFILE_SUFFIX}"
+    profiler.dump_stats(os.path.join(settings.PROFILE_ROOT, name))
+    return name
+
+
+def parse_profile_name(name: str) -> dict:
+    report_request_id, view_name, timestamp, elapsed = name[:-len(PROFILE_SUFFIX)].split("__")
+    return {
+        "name": name,
+        "id": "__".join([report_request_id, view_name, timestamp]),
+        "report_request": None if report_request_id == "none" else int(report_request_id),
+        "view": view_name,
+        "created_at": timestamp,
+        "duration_ms": int(elapsed[:-2]),
+    }
+
+
+def find_profile(name_or_id: str):
+    """
+    Chemin du profil désigné par son nom de fichier ou son X-Profile-Id, sinon None.
+    """
+    name_or_id = os.path.basename(name_or_id)
+    if name_or_id.endswith(PROFILE_SUFFIX):
+        path = os.path.join(settings.PROFILE_ROOT, name_or_id)
+        return path if os.path.exists(path) else None
+    matches = glob.glob(os.path.join(glob.escape(settings.PROFILE_ROOT), f"{glob.escape(name_or_id)}__*ms{PROFILE_SUFFIX}"))
+    return matches[0] if matches else None
+
+
+def list_profiles(report_request_id=None) -> list[dict]:
+    if not os.path.isdir(settings.PROFILE_ROOT):
+        return []
+    profiles = []
+    for name in sorted(os.listdir(settings.PROFILE_ROOT), reverse=True):
+        if not name.endswith(PROFILE_SUFFIX):
+            continue
+        try:
+            info = parse_profile_name(name)
+        except ValueError:
+            continue
+        if report_request_id is not None and info["report_request"] != report_request_id:
+            continue
+        info["size"] = os.path.getsize(os.path.join(settings.PROFILE_ROOT, name))
+        profiles.append(info)
+    return profiles
+
+
+class _RequestProfile:
+    """
+    Profileur d'une requête, détenteur de _profiler_lock jusqu'à finish().
+    """
+
+    def __init__(self):
+        self.profiler = cProfile.Profile()
+        self.started_at = datetime.now()
+        self._start = time.perf_counter()
+        self._finished = False
+        self.profiler.enable()
+
+    def pause(self):
+        self.profiler.disable()
+
+    def resume(self):
+        self.profiler.enable()
+
+    def finish(self, profile_id=None):
+        """
+        Arrête le profilage, sauvegarde le profil si profile_id est fourni et libère le verrou.
+        """
+        if self._finished:
+            return
+        self._finished = True
+        self.profiler.disable()
+        try:
+            if profile_id is not None:
+                save_profile(self.profiler, profile_id, int((time.perf_counter() - self._start) * 1000))
+        finally:
+            _profiler_lock.release()
+
+
+class _ProfiledStream:
+    """
+    Enveloppe le streaming_content d'une réponse : le profilage reprend autour
+    de chaque bloc lu (lecture disque comprise) et le profil est sauvegardé à
+    la fermeture de la réponse, même si le corps n'a pas été entièrement envoyé.
+    """
+
+    def __init__(self, chunks, profile, profile_id):
+        self._chunks = iter(chunks)
+        self._profile = profile
+        self._profile_id = profile_id
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        self._profile.resume()
+        try:
+            return next(self._chunks)
+        finally:
+            self._profile.pause()
+
+    def close(self):
+        self._profile.finish(self._profile_id)
+
+
+class ProfiledViewMixin:
+    """
+    À placer avant APIView : quand profiling_requested() est vrai (après
+    l'authentification DRF), profile la vue puis l'envoi du corps, et renvoie
+    l'identifiant du profil dans X-Profile-Id. Les vues renseignent
+    self.report_request_id, ou surchargent get_profile_report_request_id().
+    """
+    report_request_id = None
+    _profile = None
+    _profile_busy = False
+
+    def get_profile_report_request_id(self):
+        return self.report_request_id
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if not profiling_requested(request):
+            return
+        if _profiler_lock.acquire(blocking=False):
+            self._profile = _RequestProfile()
+        else:
+            self._profile_busy = True
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if self._profile_busy:
+            response[PROFILE_HEADER] = "busy"
+        profile, self._profile = self._profile, None
+        if profile is None:
+            return response
+
+        profile.pause()
+        profile_id = make_profile_id(self.get_profile_report_request_id(), type(self).__name__, profile.started_at)
+        response["X-Profile-Id"] = profile_id
+        if response.streaming and not response.is_async:
+            response.streaming_content = _ProfiledStream(response.streaming_content, profile, profile_id)
+        else:
+            profile.finish(profile_id)
+        return response
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            # Exception non rattrapée par DRF : ne pas laisser le profileur actif ni le verrou pris
+            if self._profile is not None:
+                profile, self._profile = self._profile, None
+                profile.finish()
@@ -0,0 +1,96 @@
+# backend/api/reference_cache.py
+"""
+Cache mémoire (par process) des données de référence Country / RiskCategory.
+
+Chaque table garde un instantané sérialisé, estampillé par un hash de son
+contenu (utilisé comme ETag), ainsi que des index par id et par nom / code.
+Les signaux post_save / post_delete (voir api/signals.py) invalident
+l'instantané ; REFERENCE_CACHE_TTL borne la durée de vie des données dans
+les autres workers, qui ne reçoivent pas ces signaux.
+"""
+import hashlib
+import json
+import threading
+import time
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DatabaseError
+
+from .models import Country, RiskCategory
+from .serializers import CountrySerializer, RiskCategorySerializer
+
+
+class ReferenceSnapshot:
+    def __init__(self, data, index_fields):
+        self.data = data
+        self.built_at = time.monotonic()
+        payload = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True).encode("utf-8")
+        self.etag = hashlib.sha1(payload).hexdigest()
+        self.by_id = {row["id"]: row for row in data}
+        self.indexes = {
+            field: {str(row[field]).lower(): row for row in data}
+            for field in index_fields
+        }
+
+    def lookup(self, value):
+        key = str(value).strip().lower()
+        for index in self.indexes.values():
+            if key in index:
+                return index[key]
+        return None
+
+
+class ReferenceTable:
+    def __init__(self, model, serializer_class, index_fields):
+        self.model = model
+        self.serializer_class = serializer_class
+        self.index_fields = index_fields
+        self._lock = threading.Lock()
+        self._snapshot = None
+
+    def _is_fresh(self, snapshot):
+        ttl = getattr(settings, "REFERENCE_CACHE_TTL", 300)
+        return snapshot is not None and (not ttl or time.monotonic() - snapshot.built_at < ttl)
+
+    def snapshot(self):
+        snapshot = self._snapshot
+        if self._is_fresh(snapshot):
+            return snapshot
+        with self._lock:
+            if not self._is_fresh(self._snapshot):
+                rows = self.serializer_class(self.model.objects.order_by("pk"), many=True).data
+                self._snapshot = ReferenceSnapshot([dict(row) for row in rows], self.index_fields)
+            return self._snapshot
+
+    def invalidate(self):
+        with self._lock:
+            self._snapshot = None
+
+
+countries = ReferenceTable(Country, CountrySerializer, ("name", "iso_code"))
+risk_categories = ReferenceTable(RiskCategory, RiskCategorySerializer, ("risk_type",))
+
+
+def _safe_lookup(table, value):
+    # Les lookups servent la génération de rapports, qui doit continuer à
+    # fonctionner si le référentiel est indisponible (base non migrée, etc.).
+    try:
+        return table.snapshot().lookup(value)
+    except DatabaseError as e:
+        print(f"Référentiel {table.model.__name__} indisponible : {e}")
+        return None
+
+
+def get_country(value):
+    """
+    Retourne la ligne sérialisée du pays (par nom ou code ISO), ou None.
+    """
+    return _safe_lookup(countries, value)
+
+
+def get_risk_category(value):
+    """
+    Retourne la ligne sérialisée de la catégorie de risque (par risk_type), ou None.
+    """
+    return _safe_lookup(risk_categories, value)
@@ -0,0 +1,16 @@
+# backend/api/signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import reference_cache
+from .models import Country, RiskCategory
+
+
+@receiver([post_save, post_delete], sender=Country)
+def invalidate_countries(sender, **kwargs):
+    reference_cache.countries.invalidate()
+
+
+@receiver([post_save, post_delete], sender=RiskCategory)
+def invalidate_risk_categories(sender, **kwargs):
+    reference_cache.risk_categories.invalidate()
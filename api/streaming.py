@@ -0,0 +1,26 @@
+# backend/api/streaming.py
+"""
+Mode "stream" de la génération de rapports, partagé par api/ et reports/ :
+le PDF est rendu dans un tampon (mémoire jusqu'à REPORT_STREAM_SPOOL_MAX_SIZE
+octets, puis fichier temporaire) et renvoyé directement, sans passer par
+MEDIA_ROOT/reports.
+"""
+import tempfile
+
+from django.conf import settings
+from django.http import FileResponse
+
+
+def stream_requested(data, query_params) -> bool:
+    value = data.get("stream", query_params.get("stream", ""))
+    return str(value).lower() in ("1", "true", "yes")
+
+
+def report_buffer():
+    return tempfile.SpooledTemporaryFile(max_size=settings.REPORT_STREAM_SPOOL_MAX_SIZE, suffix=".pdf")
+
+
+def report_file_response(fileobj, filename):
+    # FileResponse ferme le tampon une fois la réponse envoyée.
+    fileobj.seek(0)
+    return FileResponse(fileobj, as_attachment=True, filename=filename, content_type="application/pdf")
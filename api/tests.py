@@ -0,0 +1,616 @@
+# backend/api/tests.py
+import base64
+import csv
+import io
+import json
+import os
+import pstats
+import tempfile
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.db import DatabaseError
+from django.test import TestCase, override_settings
+from django.utils import timezone
+import httpx
+from rest_framework.test import APIClient
+
+from . import exports, pregeneration, profiling, reference_cache
+from .management.commands.warm_reports import Command as WarmReportsCommand
+from .models import Country, ReportRequest, RiskCategory, RiskData
+
+
+def _reset_reference_cache():
+    reference_cache.countries.invalidate()
+    reference_cache.risk_categories.invalidate()
+
+
+class ReferenceCacheTestCase(TestCase):
+    """
+    Le cache de référentiel est propre au process et survit au rollback de
+    chaque test (aucun signal n'est émis) : il est vidé avant et après.
+    """
+
+    def setUp(self):
+        super().setUp()
+        _reset_reference_cache()
+        self.addCleanup(_reset_reference_cache)
+
+
+class ReferenceCacheTests(ReferenceCacheTestCase):
+    def setUp(self):
+        super().setUp()
+        self.kenya = Country.objects.create(name="Kenya", iso_code="KEN", region="Africa")
+        self.client = APIClient()
+
+    def test_list_sets_etag_and_returns_304(self):
+        response = self.client.get("/api/countries/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]["name"], "Kenya")
+        self.assertIn("max-age", response["Cache-Control"])
+
+        response = self.client.get("/api/countries/", HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+    def test_save_invalidates_snapshot(self):
+        etag = self.client.get("/api/countries/")["ETag"]
+        Country.objects.create(name="Nigeria", iso_code="NGA", region="Africa")
+        response = self.client.get("/api/countries/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 2)
+
+    def test_lookup_by_name_or_iso_code(self):
+        self.assertEqual(reference_cache.get_country("ken")["name"], "Kenya")
+        self.assertEqual(reference_cache.get_country(" kenya ")["iso_code"], "KEN")
+        self.assertIsNone(reference_cache.get_country("Atlantis"))
+
+    def test_lookup_falls_back_when_database_unavailable(self):
+        with mock.patch.object(reference_cache.countries, "snapshot", side_effect=DatabaseError("no such table")):
+            self.assertIsNone(reference_cache.get_country("Kenya"))
+
+    def test_writes_require_staff(self):
+        payload = {"name": "Ghana", "iso_code": "GHA", "region": "Africa"}
+        self.assertEqual(self.client.post("/api/countries/", payload).status_code, 403)
+        self.assertEqual(self.client.delete(f"/api/countries/{self.kenya.id}/").status_code, 403)
+
+        admin = User.objects.create_user("admin", password="pw", is_staff=True)
+        self.client.force_authenticate(admin)
+        self.assertEqual(self.client.post("/api/countries/", payload).status_code, 201)
+
+
+class PregenerationTests(ReferenceCacheTestCase):
+    def _request(self, country, risks, year=2025, kind="report", times=1):
+        for _ in range(times):
+            pregeneration.record_report_request(country, risks, year, kind=kind)
+
+    def test_combination_key_ignores_case_order_and_spaces(self):
+        key = pregeneration.combination_key("Kenya", ["climate", "cyber"], 2025)
+        self.assertEqual(key, pregeneration.combination_key(" kenya", ["Cyber ", "climate"], "2025"))
+        self.assertNotEqual(key, pregeneration.combination_key("Kenya", ["climate"], 2025))
+        self.assertNotEqual(key, pregeneration.combination_key("Kenya", ["climate", "cyber"], 2026))
+
+    def test_record_keeps_raw_values_and_links_seeded_categories(self):
+        report_request = pregeneration.record_report_request("Kenya", ["climate", "R-unknown"], 2025)
+        self.assertEqual(report_request.country_name, "Kenya")
+        self.assertEqual(report_request.risks, ["climate", "R-unknown"])
+        self.assertEqual(
+            list(report_request.risk_categories.values_list("risk_type", flat=True)), ["climate"]
+        )
+
+    def test_popular_combinations_ranks_by_kind_and_window(self):
+        self._request("Kenya", ["climate", "cyber"], times=3)
+        self._request("Kenya", ["cyber", "climate"], times=1)
+        self._request("Nigeria", ["water"], times=2)
+        self._request("Ethiopia", ["food"], kind="podcast", times=5)
+        old = pregeneration.record_report_request("Ghana", ["energy"], 2025)
+        ReportRequest.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=90))
+
+        self.assertEqual(pregeneration.popular_combinations(top=10, days=30), [
+            ("Kenya", ["climate", "cyber"], 2025, 4),
+            ("Nigeria", ["water"], 2025, 2),
+        ])
+        self.assertEqual(pregeneration.popular_combinations(top=1, days=30, kind="podcast"), [
+            ("Ethiopia", ["food"], 2025, 5),
+        ])
+
+    @override_settings(WARMUP_OFF_PEAK_HOURS="22-5", WARMUP_TIMEZONE="UTC")
+    def test_off_peak_window_wraps_midnight(self):
+        def at(hour):
+            return datetime(2025, 1, 1, hour, tzinfo=dt_timezone.utc)
+
+        self.assertTrue(pregeneration.in_off_peak_window(at(23)))
+        self.assertTrue(pregeneration.in_off_peak_window(at(0)))
+        self.assertTrue(pregeneration.in_off_peak_window(at(4)))
+        self.assertFalse(pregeneration.in_off_peak_window(at(5)))
+        self.assertFalse(pregeneration.in_off_peak_window(at(12)))
+
+    @override_settings(WARMUP_OFF_PEAK_HOURS="1-6", WARMUP_TIMEZONE="Africa/Nairobi")
+    def test_off_peak_window_uses_configured_timezone(self):
+        # 23:00 UTC = 02:00 à Nairobi
+        self.assertTrue(pregeneration.in_off_peak_window(datetime(2025, 1, 1, 23, tzinfo=dt_timezone.utc)))
+        self.assertFalse(pregeneration.in_off_peak_window(datetime(2025, 1, 1, 6, tzinfo=dt_timezone.utc)))
+
+    def test_warm_respects_upstream_budget(self):
+        self._request("Kenya", ["climate", "cyber", "water"], times=5)  # coût 3
+        self._request("Nigeria", ["water"], kind="podcast", times=4)    # coût 2
+        self._request("Ghana", ["energy", "food"], times=3)             # coût 2
+
+        command = WarmReportsCommand(stdout=StringIO())
+        with mock.patch.object(command, "warm_report") as warm_report, \
+                mock.patch.object(command, "warm_podcast") as warm_podcast, \
+                mock.patch.object(pregeneration, "find_warm_report", return_value=None), \
+                mock.patch.object(pregeneration, "find_warm_podcast", return_value=None):
+            spent = command.warm(top=10, days=30, budget=4, kinds={"report", "podcast"})
+
+        # Kenya (3) passe ; Nigeria (2) dépasserait le budget ; Ghana (2) non plus.
+        self.assertEqual(spent, 3)
+        self.assertEqual([c.args[0] for c in warm_report.call_args_list], ["Kenya"])
+        warm_podcast.assert_not_called()
+
+        with mock.patch.object(command, "warm_report") as warm_report, \
+                mock.patch.object(command, "warm_podcast", return_value=2) as warm_podcast, \
+                mock.patch.object(pregeneration, "find_warm_report", return_value=None), \
+                mock.patch.object(pregeneration, "find_warm_podcast", return_value=None):
+            spent = command.warm(top=10, days=30, budget=5, kinds={"report", "podcast"})
+
+        self.assertEqual(spent, 5)
+        self.assertEqual([c.args[0] for c in warm_report.call_args_list], ["Kenya"])
+        self.assertEqual([c.args[0] for c in warm_podcast.call_args_list], ["Nigeria"])
+        self.assertEqual(warm_podcast.call_args.args[4], 2)  # budget restant transmis
+
+    def test_podcast_cost_counts_every_uncached_segment(self):
+        from services import podcast_generator, tts_segments
+
+        self._request("Nigeria", ["water"], kind="podcast", times=2)
+        script = "<voice emotion=\"serious\">Un.\n\nDeux. <break time=\"500ms\"/> Trois.\n\nQuatre.</voice>"
+
+        with tempfile.TemporaryDirectory() as tmp:
+            def fake_script(country, risks, year, title):
+                path = os.path.join(tmp, f"{title}.txt")
+                open(path, "w").close()
+                return script, path
+
+            command = WarmReportsCommand(stdout=StringIO())
+            with mock.patch.object(tts_segments, "TTS_CACHE_DIR", tmp), \
+                    mock.patch.object(podcast_generator, "generate_podcast_script", side_effect=fake_script), \
+                    mock.patch.object(podcast_generator, "synthesize_podcast") as synthesize, \
+                    mock.patch.object(pregeneration, "find_warm_podcast", return_value=None):
+                # 1 appel Groq + 4 segments = 5 > 4 : script payé, synthèse non lancée
+                spent = command.warm(top=10, days=30, budget=4, kinds={"podcast"})
+                self.assertEqual(spent, 1)
+                synthesize.assert_not_called()
+                self.assertEqual(os.listdir(tmp), [])
+
+                spent = command.warm(top=10, days=30, budget=5, kinds={"podcast"})
+                self.assertEqual(spent, 5)
+                self.assertEqual(synthesize.call_args.kwargs["max_calls"], 4)
+
+    def test_popular_combinations_ignores_case_and_order(self):
+        self._request("Kenya", ["Climate", "cyber"])
+        self._request(" kenya", ["cyber", "climate "])
+        self._request("Kenya", ["water"])
+
+        top = pregeneration.popular_combinations(top=10, days=30)
+        self.assertEqual(top[0], ("Kenya", ["Climate", "cyber"], 2025, 2))
+        self.assertEqual(len(top), 2)
+
+    def test_loop_survives_failed_pass(self):
+        command = WarmReportsCommand(stdout=StringIO(), stderr=StringIO())
+        with mock.patch.object(pregeneration, "in_off_peak_window", return_value=True), \
+                mock.patch.object(command, "warm", side_effect=DatabaseError("down")) as warm, \
+                mock.patch("time.sleep", side_effect=[None, KeyboardInterrupt]):
+            with self.assertRaises(KeyboardInterrupt):
+                command.handle(top=10, days=30, budget=10, kinds="report", loop=True, interval=1)
+        self.assertEqual(warm.call_count, 2)
+        self.assertIn("down", command.stderr.getvalue())
+
+    def test_warm_skips_fresh_artifacts(self):
+        self._request("Kenya", ["climate"], times=2)
+        command = WarmReportsCommand(stdout=StringIO())
+        with mock.patch.object(command, "warm_report") as warm_report, \
+                mock.patch.object(pregeneration, "find_warm_report", return_value="/tmp/warm.pdf"):
+            spent = command.warm(top=10, days=30, budget=10, kinds={"report"})
+        self.assertEqual(spent, 0)
+        warm_report.assert_not_called()
+
+    def test_prune_keeps_only_newest_warm_podcast(self):
+        with tempfile.TemporaryDirectory() as media_root:
+            podcast_dir = os.path.join(media_root, "podcast")
+            os.makedirs(podcast_dir)
+            os.makedirs(os.path.join(media_root, "texts"))
+            title = pregeneration.warm_podcast_title("Kenya", ["climate"], 2025)
+            for stamp in ("2025-01-01_00-00-00", "2025-02-01_00-00-00"):
+                open(os.path.join(podcast_dir, f"{title}_{stamp}.mp3"), "wb").close()
+                open(os.path.join(media_root, "texts", f"{title}_{stamp}.txt"), "w").close()
+
+            with override_settings(MEDIA_ROOT=media_root, WARMUP_MAX_AGE=0), \
+                    mock.patch.object(pregeneration, "WARM_PODCAST_DIR", podcast_dir):
+                pregeneration.prune_warm_podcasts("Kenya", ["climate"], 2025)
+                mp3_path, text_path = pregeneration.find_warm_podcast("Kenya", ["climate"], 2025)
+
+            self.assertEqual(os.listdir(podcast_dir), [f"{title}_2025-02-01_00-00-00.mp3"])
+            self.assertEqual(os.listdir(os.path.join(media_root, "texts")), [f"{title}_2025-02-01_00-00-00.txt"])
+            self.assertTrue(mp3_path.endswith("2025-02-01_00-00-00.mp3"))
+            self.assertTrue(text_path.endswith("2025-02-01_00-00-00.txt"))
+
+
+class ProfilingTests(ReferenceCacheTestCase):
+    def setUp(self):
+        super().setUp()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        settings_override = override_settings(PROFILE_ROOT=tmp.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.profile_root = tmp.name
+
+        self.client = APIClient()
+        self.staff = User.objects.create_user("admin", password="pw", is_staff=True)
+        self.user = User.objects.create_user("user", password="pw")
+        self.payload = {"country": "Kenya", "risks": ["climate"], "year": 2025}
+
+    def _generate_report(self, **headers):
+        with mock.patch("reports.views.generate_report_pdf"):
+            return self.client.post("/reports/generate/", self.payload, format="json", **headers)
+
+    def test_staff_profile_is_linked_to_report_request(self):
+        self.client.force_login(self.staff)
+        response = self._generate_report(HTTP_X_PROFILE="1")
+
+        self.assertEqual(response.status_code, 200)
+        report_request = ReportRequest.objects.get()
+        self.assertEqual(report_request.status, "completed")
+        profiles = profiling.list_profiles(report_request.id)
+        self.assertEqual([p["id"] for p in profiles], [response["X-Profile-Id"]])
+        self.assertEqual(profiles[0]["view"], "GenerateReportView")
+
+        download = self.client.get(f"/api/profiles/{response['X-Profile-Id']}")
+        self.assertEqual(download.status_code, 200)
+        self.assertEqual(download["Content-Disposition"], f'attachment; filename="{profiles[0]["name"]}"')
+
+    def test_basic_auth_staff_can_profile(self):
+        credentials = base64.b64encode(b"admin:pw").decode("ascii")
+        response = self._generate_report(HTTP_X_PROFILE="1", HTTP_AUTHORIZATION=f"Basic {credentials}")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("X-Profile-Id", response)
+        self.assertEqual(len(os.listdir(self.profile_root)), 1)
+
+    def test_download_profile_covers_file_streaming(self):
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            os.makedirs(os.path.join(media_root, "reports"))
+            file_path = os.path.join(media_root, "reports", "Rapport.pdf")
+            with open(file_path, "wb") as f:
+                f.write(b"%PDF-" + b"x" * 200_000)
+            ReportRequest.objects.create(start_date=date(2025, 1, 1), end_date=date(2025, 12, 31),
+                                         forecast_horizon=0, file_path=file_path)
+
+            self.client.force_login(self.staff)
+            response = self.client.get("/reports/download/Rapport.pdf?profile=1")
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(os.listdir(self.profile_root), [])  # sauvegardé à la fermeture seulement
+            self.assertEqual(len(b"".join(response.streaming_content)), 200_005)
+
+        (profile,) = profiling.list_profiles(ReportRequest.objects.get().id)
+        self.assertEqual(profile["id"], response["X-Profile-Id"])
+        stats = pstats.Stats(os.path.join(self.profile_root, profile["name"]))
+        self.assertTrue(any("read" in func[2] for func in stats.stats))
+        self.assertTrue(profiling._profiler_lock.acquire(blocking=False))
+        profiling._profiler_lock.release()
+
+    def test_podcast_profile_is_linked_to_report_request(self):
+        self.client.force_login(self.staff)
+        with mock.patch("api.views.podcast_generator.generate_podcast",
+                        return_value=("/tmp/p.mp3", "/tmp/p.txt")):
+            response = self.client.post("/api/podcast/generate", self.payload, format="json",
+                                        HTTP_X_PROFILE="1")
+
+        self.assertEqual(response.status_code, 200)
+        report_request = ReportRequest.objects.get(kind="podcast")
+        self.assertTrue(response["X-Profile-Id"].startswith(f"{report_request.id}__"))
+
+    def test_non_staff_request_is_not_profiled(self):
+        self.client.force_login(self.user)
+        response = self._generate_report(HTTP_X_PROFILE="1")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("X-Profile-Id", response)
+        self.assertEqual(os.listdir(self.profile_root), [])
+
+    def test_concurrent_request_is_marked_busy(self):
+        self.client.force_login(self.staff)
+        with profiling._profiler_lock:
+            response = self._generate_report(HTTP_X_PROFILE="1")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response[profiling.PROFILE_HEADER], "busy")
+        self.assertNotIn("X-Profile-Id", response)
+
+    def test_parse_profile_name(self):
+        info = profiling.parse_profile_name("42__GenerateReportView__2025-01-01_00-00-00-000000__153ms.prof")
+        self.assertEqual(info["report_request"], 42)
+        self.assertEqual(info["view"], "GenerateReportView")
+        self.assertEqual(info["duration_ms"], 153)
+        self.assertEqual(info["id"], "42__GenerateReportView__2025-01-01_00-00-00-000000")
+        self.assertIsNone(profiling.parse_profile_name("none__V__2025-01-01_00-00-00-000000__1ms.prof")["report_request"])
+
+    def test_list_profiles_filters_and_skips_foreign_files(self):
+        for name in ("1__V__2025-01-01_00-00-00-000000__5ms.prof",
+                     "2__V__2025-01-02_00-00-00-000000__7ms.prof",
+                     "garbage.prof", "notes.txt"):
+            open(os.path.join(self.profile_root, name), "wb").close()
+
+        self.assertEqual([p["report_request"] for p in profiling.list_profiles()], [2, 1])
+        self.assertEqual([p["report_request"] for p in profiling.list_profiles(1)], [1])
+
+    def test_profile_endpoints_are_admin_only(self):
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get("/api/profiles/").status_code, 403)
+
+
+class StreamReportTests(ReferenceCacheTestCase):
+    def setUp(self):
+        super().setUp()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=tmp.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.media_root = tmp.name
+        self.client = APIClient()
+        self.payload = {"country": "Kenya", "risks": ["climate"], "year": 2025, "stream": True}
+
+    @staticmethod
+    def _fake_render(output, *args):
+        output.write(b"%PDF-fake")
+
+    def _assert_streamed(self, response):
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/pdf")
+        self.assertEqual(b"".join(response.streaming_content), b"%PDF-fake")
+        self.assertEqual(os.listdir(self.media_root), [])
+        self.assertEqual(ReportRequest.objects.get().status, "completed")
+
+    def test_api_view_streams_without_writing_media(self):
+        with mock.patch("api.views.report_service.generate_report_pdf", side_effect=self._fake_render):
+            response = self.client.post("/api/report/generate", self.payload, format="json")
+        self._assert_streamed(response)
+
+    def test_reports_view_streams_without_writing_media(self):
+        with mock.patch("reports.views.generate_report_pdf", side_effect=self._fake_render):
+            payload = {key: value for key, value in self.payload.items() if key != "stream"}
+            response = self.client.post("/reports/generate/?stream=1", payload, format="json")
+        self._assert_streamed(response)
+
+
+@override_settings(EXPORT_CHUNK_SIZE=2)
+class ExportTests(ReferenceCacheTestCase):
+    def setUp(self):
+        super().setUp()
+        kenya = Country.objects.create(name="Kenya", iso_code="KEN", region="Africa")
+        nigeria = Country.objects.create(name="Nigeria", iso_code="NGA", region="Africa")
+        climate = RiskCategory.objects.get(risk_type="climate")
+        cyber = RiskCategory.objects.get(risk_type="cyber")
+        rows = [
+            (kenya, climate, date(2025, 1, 1)),
+            (kenya, climate, date(2025, 2, 1)),
+            (kenya, cyber, date(2025, 3, 1)),
+            (nigeria, climate, date(2025, 4, 1)),
+            (nigeria, cyber, date(2025, 5, 1)),
+        ]
+        for index, (country, category, day) in enumerate(rows):
+            RiskData.objects.create(country=country, risk_category=category, date=day,
+                                    risk_level=index / 10, confidence_score=0.9, source=f"s{index}")
+        self.client = APIClient()
+
+    def _ids(self, **filters):
+        return list(exports.build_queryset("risk-data", **filters).values_list("source", flat=True))
+
+    def test_build_queryset_filters(self):
+        self.assertEqual(self._ids(country="KEN"), ["s0", "s1", "s2"])
+        self.assertEqual(self._ids(country="Nigeria", category="cyber"), ["s4"])
+        self.assertEqual(self._ids(start="2025-02-01", end="2025-04-01"), ["s1", "s2", "s3"])
+
+        cutoff = RiskData.objects.get(source="s2").created_at
+        RiskData.objects.filter(source__in=["s3", "s4"]).update(created_at=cutoff + timedelta(seconds=1))
+        self.assertEqual(self._ids(since=cutoff.isoformat()), ["s3", "s4"])
+
+        with self.assertRaises(exports.ExportError):
+            exports.build_queryset("risk-data", country="Atlantis")
+        with self.assertRaises(exports.ExportError):
+            exports.build_queryset("risk-data", category="volcano")
+        with self.assertRaises(exports.ExportError):
+            exports.build_queryset("risk-data", start="01/02/2025")
+        with self.assertRaises(exports.ExportError):
+            exports.build_queryset("unknown")
+
+    def test_csv_is_streamed_in_chunks(self):
+        blocks = list(exports.iter_csv("risk-data", exports.build_queryset("risk-data")))
+        self.assertEqual(len(blocks), 3)
+
+        rows = list(csv.reader(io.StringIO(b"".join(blocks).decode("utf-8"))))
+        self.assertEqual(rows[0], [name for name, _, _ in exports.DATASETS["risk-data"][1]])
+        self.assertEqual([row[6] for row in rows[1:]], ["s0", "s1", "s2", "s3", "s4"])
+
+    def test_npz_round_trip(self):
+        import numpy as np
+
+        queryset = exports.build_queryset("risk-data", country="KEN")
+        archive = np.load(io.BytesIO(b"".join(exports.iter_npz("risk-data", queryset))))
+
+        self.assertEqual(sorted(archive.files), sorted(name for name, _, _ in exports.DATASETS["risk-data"][1]))
+        self.assertEqual(archive["country"].tolist(), ["KEN"] * 3)
+        self.assertEqual(archive["risk_type"].tolist(), ["climate", "climate", "cyber"])
+        self.assertEqual(archive["date"].tolist(), [date(2025, 1, 1), date(2025, 2, 1), date(2025, 3, 1)])
+        np.testing.assert_allclose(archive["risk_level"], [0.0, 0.1, 0.2])
+        self.assertEqual(archive["created_at"].dtype, np.dtype("datetime64[us]"))
+
+    def test_export_command_writes_npz_and_next_since(self):
+        import numpy as np
+
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, "risk-data.npz")
+            stdout = StringIO()
+            call_command("export_risk_data", "risk-data", "--country", "NGA", "--output", output, stdout=stdout)
+            with np.load(output) as archive:
+                self.assertEqual(archive["source"].tolist(), ["s3", "s4"])
+        self.assertIn("--since", stdout.getvalue())
+
+    def test_npz_detects_deleted_rows(self):
+        queryset = exports.build_queryset("risk-data")
+        blocks = exports.iter_npz("risk-data", queryset)
+        next(blocks)  # count() déjà fait, première colonne entamée
+        RiskData.objects.filter(source="s4").delete()
+        with self.assertRaises(exports.ExportError):
+            list(blocks)
+
+    def test_unknown_filter_is_rejected(self):
+        self.client.force_login(User.objects.create_user("admin", password="pw", is_staff=True))
+        response = self.client.get("/api/exports/risk-data.csv?country=Atlantis")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Atlantis", response.json()["error"])
+
+        with self.assertRaisesMessage(CommandError, "Unknown category"):
+            call_command("export_risk_data", "risk-data", "--category", "volcano", stdout=StringIO())
+
+    def test_export_view_is_admin_only_and_returns_next_since(self):
+        self.assertEqual(self.client.get("/api/exports/risk-data.npz").status_code, 403)
+
+        self.client.force_login(User.objects.create_user("admin", password="pw", is_staff=True))
+        response = self.client.get("/api/exports/risk-data.npz?country=KEN")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        last = RiskData.objects.filter(country__iso_code="KEN").latest("created_at").created_at
+        self.assertEqual(response["X-Export-Next-Since"], last.isoformat())
+
+        response = self.client.get("/api/exports/risk-data.csv", {"since": response["X-Export-Next-Since"]})
+        self.assertEqual(b"".join(response.streaming_content).decode("utf-8").count("\n"), 1 + 2)
+
+
+class AsyncGenerationTests(ReferenceCacheTestCase):
+    """
+    Vues async (ASGI) : Groq et ElevenLabs sont simulés au niveau transport
+    httpx, le rendu PDF passe par le vrai pool de process "spawn".
+    """
+
+    def setUp(self):
+        super().setUp()
+        from services import podcast_generator, text_podcast, tts_segments
+
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.media_root = tmp.name
+        for subdir in ("podcast", "texts", "tts"):
+            os.makedirs(os.path.join(tmp.name, subdir))
+        settings_override = override_settings(MEDIA_ROOT=tmp.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        for patcher in (
+            mock.patch.object(podcast_generator, "PODCAST_DIR", os.path.join(tmp.name, "podcast")),
+            mock.patch.object(podcast_generator, "TEXT_DIR", os.path.join(tmp.name, "texts")),
+            mock.patch.object(text_podcast, "TEXT_DIR", os.path.join(tmp.name, "texts")),
+            mock.patch.object(tts_segments, "TTS_CACHE_DIR", os.path.join(tmp.name, "tts")),
+            mock.patch("httpx.AsyncClient", side_effect=self._mock_client),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        Country.objects.create(name="Kenya", iso_code="KEN", region="Africa")
+        self.upstream = []
+        self.script = "Introduction.\n\nConclusion."
+
+    _AsyncClient = httpx.AsyncClient
+
+    def _mock_client(self, *args, **kwargs):
+        return self._AsyncClient(transport=httpx.MockTransport(self._handle))
+
+    def _handle(self, request):
+        self.upstream.append(request)
+        body = json.loads(request.content)
+        if request.url.host == "api.groq.com":
+            return httpx.Response(200, json={"choices": [{"message": {"content": self.script}}]})
+        return httpx.Response(200, content=body["text"].encode("utf-8"))
+
+    @staticmethod
+    async def _content(response):
+        if response.is_async:
+            return b"".join([chunk async for chunk in response.streaming_content])
+        return b"".join(response.streaming_content)
+
+    async def test_report_json_body_renders_in_process_pool(self):
+        from services import report_service
+
+        render = mock.Mock(wraps=report_service._get_render_executor)
+        with mock.patch.object(report_service, "_get_render_executor", render):
+            response = await self.async_client.post(
+            "/api/report/generate/async",
+                {"country": "KEN", "risks": ["climate", "cyber"], "year": 2025},
+                content_type="application/json",
+            )
+
+        self.assertEqual(response.status_code, 200)
+        render.assert_called_once()
+        self.assertEqual(response.json()["download_url"], "/media/reports/Rapport_Risques_Kenya_2025.pdf")
+        with open(os.path.join(self.media_root, "reports", "Rapport_Risques_Kenya_2025.pdf"), "rb") as f:
+            self.assertEqual(f.read(5), b"%PDF-")
+        self.assertEqual(len(self.upstream), 2)
+        report_request = await ReportRequest.objects.aget()
+        self.assertEqual(report_request.status, "completed")
+
+    async def test_report_form_body_with_stream(self):
+        response = await self.async_client.post(
+            "/api/report/generate/async",
+            "country=Kenya&risks=climate&risks=cyber&year=2025&stream=1",
+            content_type="application/x-www-form-urlencoded",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/pdf")
+        self.assertTrue((await self._content(response)).startswith(b"%PDF-"))
+        self.assertFalse(os.path.exists(os.path.join(self.media_root, "reports")))
+        self.assertEqual(len(self.upstream), 2)
+
+    async def test_report_warm_hit_skips_upstream(self):
+        warm_path = os.path.join(self.media_root, "warm.pdf")
+        with open(warm_path, "wb") as f:
+            f.write(b"%PDF-warm")
+
+        with mock.patch.object(pregeneration, "find_warm_report", return_value=warm_path):
+            response = await self.async_client.post(
+                "/api/report/generate/async",
+                {"country": "Kenya", "risks": ["climate"], "year": 2025, "stream": True},
+                content_type="application/json",
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(await self._content(response), b"%PDF-warm")
+        self.assertEqual(self.upstream, [])
+
+    async def test_invalid_bodies_return_400(self):
+        for body in ("[1]", "not json", json.dumps({"country": "Kenya"})):
+            response = await self.async_client.post(
+                "/api/report/generate/async", body, content_type="application/json"
+            )
+            self.assertEqual(response.status_code, 400)
+
+    async def test_podcast_uses_canonical_country_and_tts_cache(self):
+        payload = {"country": "KEN", "risks": ["climate"], "year": 2025}
+        response = await self.async_client.post(
+            "/api/podcast/generate/async", payload, content_type="application/json"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        mp3_name = os.path.basename(response.json()["mp3_url"])
+        with open(os.path.join(self.media_root, "podcast", mp3_name), "rb") as f:
+            self.assertEqual(f.read(), "Introduction.Conclusion.".encode("utf-8"))
+        groq_prompt = json.loads(self.upstream[0].content)["messages"][0]["content"]
+        self.assertIn("Country: Kenya", groq_prompt)
+        self.assertEqual(len(self.upstream), 3)  # 1 Groq + 2 segments
+
+        await self.async_client.post("/api/podcast/generate/async", payload, content_type="application/json")
+        self.assertEqual(len(self.upstream), 4)  # segments déjà en cache : Groq seulement
+        report_request = await ReportRequest.objects.filter(kind="podcast").alatest("created_at")
+        self.assertEqual(report_request.country_name, "Kenya")
@@ -1,10 +1,20 @@
 # backend/api/urls.py
 from django.urls import path
+from rest_framework.routers import DefaultRouter
 from .views import GenerateReportView, CSRFTokenView, GeneratePodcastView
 from . import views
 
+router = DefaultRouter()
+router.register(r'countries', views.CountryViewSet)
+router.register(r'risk-categories', views.RiskCategoryViewSet)
+
 urlpatterns = [
     path('report/generate', views.GenerateReportView.as_view(), name='generate-report'),
     path('podcast/generate', views.GeneratePodcastView.as_view(), name='generate-podcast'),
+    path('report/generate/async', views.AsyncGenerateReportView.as_view(), name='generate-report-async'),
+    path('podcast/generate/async', views.AsyncGeneratePodcastView.as_view(), name='generate-podcast-async'),
     path('csrf/', views.CSRFTokenView.as_view(), name='get-csrf-token'),
-]
+    path('exports/<slug:dataset>.<slug:ext>', views.ExportView.as_view(), name='export-risk-data'),
+    path('profiles/', views.ProfileListView.as_view(), name='list-profiles'),
+    path('profiles/<str:name>', views.ProfileDownloadView.as_view(), name='download-profile'),
+] + router.urls
@@ -9,11 +9,20 @@ def generate_report(countries, risks, year, format_="pdf"):
     return report_service.generate_report_pdf(file_path, ', '.join(countries), risks, int(year))
 # backend/api/views.py
 import os
+import json
+import asyncio
+from asgiref.sync import sync_to_async
 from django.conf import settings
+from django.http import FileResponse, JsonResponse, StreamingHttpResponse
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags, quote_etag
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
 from rest_framework import viewsets, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAdminUser
+from rest_framework.exceptions import NotFound
 from django.views.decorators.csrf import ensure_csrf_cookie
 from django.utils.decorators import method_decorator
 from services import podcast_generator
@@ -28,8 +37,10 @@ from .serializers import (
     ReportGenerationSerializer
 )
 from services import report_service
+from . import exports, pregeneration, profiling, reference_cache, streaming
+from .permissions import IsAdminOrReadOnly
 
-class GeneratePodcastView(APIView):
+class GeneratePodcastView(profiling.ProfiledViewMixin, APIView):
     def post(self, request):
         country = request.data.get("country")
         risks = request.data.get("risks", [])
@@ -83,7 +94,23 @@ class GeneratePodcastView(APIView):
             return Response({"error": "Missing required fields"}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            mp3_path, text_path = podcast_generator.generate_podcast(country, risks, int(year))
+            canonical = _canonical_country(country)
+            report_request = pregeneration.record_report_request(canonical, risks, year, kind="podcast")
+            if report_request:
+                self.report_request_id = report_request.id
+
+            warm = pregeneration.find_warm_podcast(canonical, risks, year)
+            if warm:
+                mp3_path, text_path = warm
+            else:
+                try:
+                    mp3_path, text_path = podcast_generator.generate_podcast(canonical, risks, int(year))
+                except Exception as e:
+                    pregeneration.complete_report_request(report_request, error=str(e))
+                    raise
+            pregeneration.complete_report_request(
+                report_request, mp3_path or "", "" if mp3_path else "Failed to generate podcast"
+            )
             if not mp3_path:
                 return Response({"error": "Failed to generate podcast"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -100,16 +127,59 @@ class GeneratePodcastView(APIView):
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+def _canonical_country(country):
+    """
+    Nom canonique du pays via l'index mémoire (accepte aussi le code ISO).
+    """
+    row = reference_cache.get_country(country)
+    return row["name"] if row else country
+
 # -----------------------
 # CRUD pour les modèles
 # -----------------------
-class CountryViewSet(viewsets.ModelViewSet):
+class CachedReferenceMixin:
+    """
+    Sert list/retrieve depuis le cache mémoire de reference_cache,
+    avec ETag + Cache-Control et réponses 304 sur If-None-Match.
+    """
+    reference_table = None
+
+    def _cached_response(self, request, snapshot, data):
+        etag = quote_etag(snapshot.etag)
+        if_none_match = request.headers.get("If-None-Match")
+        if if_none_match and (if_none_match.strip() == "*" or etag in parse_etags(if_none_match)):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(data)
+        response["ETag"] = etag
+        patch_cache_control(response, public=True, max_age=settings.REFERENCE_CACHE_MAX_AGE)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        snapshot = self.reference_table.snapshot()
+        return self._cached_response(request, snapshot, snapshot.data)
+
+    def retrieve(self, request, *args, **kwargs):
+        snapshot = self.reference_table.snapshot()
+        try:
+            row = snapshot.by_id.get(int(kwargs[self.lookup_url_kwarg or self.lookup_field]))
+        except (TypeError, ValueError):
+            row = None
+        if row is None:
+            raise NotFound()
+        return self._cached_response(request, snapshot, row)
+
+class CountryViewSet(CachedReferenceMixin, viewsets.ModelViewSet):
     queryset = Country.objects.all()
     serializer_class = CountrySerializer
+    permission_classes = [IsAdminOrReadOnly]
+    reference_table = reference_cache.countries
 
-class RiskCategoryViewSet(viewsets.ModelViewSet):
+class RiskCategoryViewSet(CachedReferenceMixin, viewsets.ModelViewSet):
     queryset = RiskCategory.objects.all()
     serializer_class = RiskCategorySerializer
+    permission_classes = [IsAdminOrReadOnly]
+    reference_table = reference_cache.risk_categories
 
 class RiskDataViewSet(viewsets.ModelViewSet):
     queryset = RiskData.objects.all()
@@ -123,6 +193,45 @@ class ReportRequestViewSet(viewsets.ModelViewSet):
     queryset = ReportRequest.objects.all()
     serializer_class = ReportRequestSerializer
 
+# -----------------------
+# Export colonne (CSV / .npz) de RiskData et RiskForecast
+# -----------------------
+class ExportView(APIView):
+    """
+    GET /api/exports/<dataset>.<ext>?country=&category=&start=&end=&since=
+    dataset : risk-data | risk-forecasts ; ext : csv | npz.
+    Réservé aux admins ; l'en-tête X-Export-Next-Since donne le `since` du prochain export.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, dataset, ext):
+        if ext not in exports.FORMATS:
+            return Response({"error": f"Unsupported format '{ext}'"}, status=400)
+        params = request.query_params
+        try:
+            queryset = exports.build_queryset(
+                dataset,
+                country=params.get("country"),
+                category=params.get("category"),
+                start=params.get("start"),
+                end=params.get("end"),
+                since=params.get("since"),
+            )
+        except exports.ExportError as e:
+            return Response({"error": str(e)}, status=400)
+
+        queryset, last_created_at = exports.freeze_watermark(queryset)
+        filename = f"{dataset}.{ext}"
+        if ext == "csv":
+            response = StreamingHttpResponse(exports.iter_csv(dataset, queryset), content_type="text/csv")
+        else:
+            response = StreamingHttpResponse(exports.iter_npz(dataset, queryset),
+                                             content_type="application/octet-stream")
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        if last_created_at is not None:
+            response["X-Export-Next-Since"] = last_created_at.isoformat()
+        return response
+
 # -----------------------
 # Health Check
 # -----------------------
@@ -146,7 +255,7 @@ class CSRFTokenView(APIView):
 # -----------------------
 # Génération de rapport
 # -----------------------
-class GenerateReportView(APIView):
+class GenerateReportView(profiling.ProfiledViewMixin, APIView):
     permission_classes = [AllowAny]
 
     def post(self, request):
@@ -164,11 +273,45 @@ class GenerateReportView(APIView):
             return Response({"error": "Missing required fields"}, status=400)
 
         try:
+            country = _canonical_country(country)
+            report_request = pregeneration.record_report_request(country, risks, year)
+            if report_request:
+                self.report_request_id = report_request.id
+
+            stream = streaming.stream_requested(request.data, request.query_params)
             filename = f"Rapport_Risques_{country}_{year}.pdf".replace(" ", "_")
+
+            # Rapport déjà pré-généré par warm_reports : réponse immédiate
+            warm_path = pregeneration.find_warm_report(country, risks, year)
+            if warm_path:
+                pregeneration.complete_report_request(report_request, warm_path)
+                if stream:
+                    return streaming.report_file_response(open(warm_path, "rb"), filename)
+                return Response({
+                    "message": "Report generated successfully",
+                    "download_url": pregeneration.warm_report_url(warm_path)
+                }, status=200)
+
+            if stream:
+                buffer = streaming.report_buffer()
+                try:
+                    report_service.generate_report_pdf(buffer, country, risks, int(year))
+                except Exception as e:
+                    buffer.close()
+                    pregeneration.complete_report_request(report_request, error=str(e))
+                    raise
+                pregeneration.complete_report_request(report_request)
+                return streaming.report_file_response(buffer, filename)
+
             file_path = os.path.join(settings.MEDIA_ROOT, "reports", filename)
 
             # Appel au service pour générer le PDF
-            report_service.generate_report_pdf(file_path, country, risks, int(year))
+            try:
+                report_service.generate_report_pdf(file_path, country, risks, int(year))
+            except Exception as e:
+                pregeneration.complete_report_request(report_request, error=str(e))
+                raise
+            pregeneration.complete_report_request(report_request, file_path)
 
             print(f"Report generated at: {file_path}")
             return Response({
@@ -179,3 +322,154 @@ class GenerateReportView(APIView):
             print("Error generating report:", e)
             return Response({"error": str(e)}, status=500)
 
+
+# -----------------------
+# Profils de requêtes (admin)
+# -----------------------
+class ProfileListView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        report_request = request.query_params.get("report_request")
+        try:
+            report_request = int(report_request) if report_request else None
+        except ValueError:
+            return Response({"error": "Invalid report_request"}, status=400)
+        return Response(profiling.list_profiles(report_request))
+
+
+class ProfileDownloadView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, name):
+        # name : nom de fichier .prof ou valeur de l'en-tête X-Profile-Id
+        file_path = profiling.find_profile(name)
+        if file_path is None:
+            return Response({"error": "Profile not found"}, status=404)
+        return FileResponse(open(file_path, "rb"), as_attachment=True, filename=os.path.basename(file_path))
+
+
+# -----------------------
+# Versions async (ASGI)
+# -----------------------
+def _parse_generation_request(request):
+    """
+    Extrait (country, risks, year, stream) du corps JSON ou form-encoded
+    (comme les vues DRF sync), ou None si incomplet.
+    """
+    if request.content_type in ("application/x-www-form-urlencoded", "multipart/form-data"):
+        data = request.POST
+        risks = data.getlist("risks")
+    else:
+        try:
+            data = json.loads(request.body or b"{}")
+        except ValueError:
+            return None
+        if not isinstance(data, dict):
+            return None
+        risks = data.get("risks", [])
+    country = data.get("country")
+    year = data.get("year")
+    if not country or not risks or not year:
+        return None
+    return country, risks, year, streaming.stream_requested(data, request.GET)
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncGenerateReportView(View):
+    """
+    Équivalent async de GenerateReportView : les appels Groq sont attendus sans
+    bloquer de worker et le rendu PDF part dans un pool de process.
+    """
+
+    async def post(self, request):
+        parsed = _parse_generation_request(request)
+        if parsed is None:
+            return JsonResponse({"error": "Missing required fields"}, status=400)
+        country, risks, year, stream = parsed
+
+        try:
+            country = await sync_to_async(_canonical_country)(country)
+            report_request = await sync_to_async(pregeneration.record_report_request)(country, risks, year)
+
+            filename = f"Rapport_Risques_{country}_{year}.pdf".replace(" ", "_")
+
+            warm_path = await asyncio.to_thread(pregeneration.find_warm_report, country, risks, year)
+            if warm_path:
+                await sync_to_async(pregeneration.complete_report_request)(report_request, warm_path)
+                if stream:
+                    return streaming.report_file_response(open(warm_path, "rb"), filename)
+                return JsonResponse({
+                    "message": "Report generated successfully",
+                    "download_url": pregeneration.warm_report_url(warm_path)
+                }, status=200)
+
+            if stream:
+                buffer = streaming.report_buffer()
+                try:
+                    await report_service.agenerate_report_pdf(buffer, country, risks, int(year))
+                except Exception as e:
+                    buffer.close()
+                    await sync_to_async(pregeneration.complete_report_request)(report_request, error=str(e))
+                    raise
+                await sync_to_async(pregeneration.complete_report_request)(report_request)
+                return streaming.report_file_response(buffer, filename)
+
+            file_path = os.path.join(settings.MEDIA_ROOT, "reports", filename)
+
+            try:
+                await report_service.agenerate_report_pdf(file_path, country, risks, int(year))
+            except Exception as e:
+                await sync_to_async(pregeneration.complete_report_request)(report_request, error=str(e))
+                raise
+            await sync_to_async(pregeneration.complete_report_request)(report_request, file_path)
+
+            return JsonResponse({
+                "message": "Report generated successfully",
+                "download_url": f"/media/reports/{filename}"
+            }, status=200)
+        except Exception as e:
+            print("Error generating report:", e)
+            return JsonResponse({"error": str(e)}, status=500)
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncGeneratePodcastView(View):
+    """
+    Équivalent async de GeneratePodcastView.
+    """
+
+    async def post(self, request):
+        parsed = _parse_generation_request(request)
+        if parsed is None:
+            return JsonResponse({"error": "Missing required fields"}, status=400)
+        country, risks, year, _ = parsed
+
+        try:
+            canonical = await sync_to_async(_canonical_country)(country)
+            report_request = await sync_to_async(pregeneration.record_report_request)(
+                canonical, risks, year, kind="podcast"
+            )
+
+            warm = await asyncio.to_thread(pregeneration.find_warm_podcast, canonical, risks, year)
+            if warm:
+                mp3_path, text_path = warm
+            else:
+                try:
+                    mp3_path, text_path = await podcast_generator.agenerate_podcast(canonical, risks, int(year))
+                except Exception as e:
+                    await sync_to_async(pregeneration.complete_report_request)(report_request, error=str(e))
+                    raise
+            await sync_to_async(pregeneration.complete_report_request)(
+                report_request, mp3_path or "", "" if mp3_path else "Failed to generate podcast"
+            )
+            if not mp3_path:
+                return JsonResponse({"error": "Failed to generate podcast"}, status=500)
+
+            return JsonResponse({
+                "message": "Podcast generated successfully",
+                "mp3_url": f"/media/podcast/{os.path.basename(mp3_path)}",
+                "text_url": f"/media/texts/{os.path.basename(text_path)}"
+            }, status=200)
+        except Exception as e:
+            return JsonResponse({"error": str(e)}, status=500)
@@ -5,8 +5,12 @@ from django.http import JsonResponse, FileResponse
 from rest_framework.views import APIView
 from rest_framework.permissions import AllowAny
 from services.report_service import generate_report_pdf
+from api import pregeneration, streaming
+from api.models import ReportRequest
+from api.profiling import ProfiledViewMixin
+from api.reference_cache import get_country
 
-class GenerateReportView(APIView):
+class GenerateReportView(ProfiledViewMixin, APIView):
     permission_classes = [AllowAny]
 
     def post(self, request):
@@ -18,23 +22,50 @@ class GenerateReportView(APIView):
         if not country or not risks or not year:
             return JsonResponse({"error": "Missing required data"}, status=400)
 
+        row = get_country(country)
+        if row:
+            country = row["name"]
         filename = f"Rapport_Risques_{country}_{year}.pdf".replace(" ", "_")
         file_path = os.path.join(settings.MEDIA_ROOT, "reports", filename)
 
+        stream = streaming.stream_requested(data, request.query_params)
+        buffer = streaming.report_buffer() if stream else None
+
+        report_request = None
         try:
-            generate_report_pdf(file_path, country, risks, year)
+            report_request = pregeneration.record_report_request(country, risks, year)
+            if report_request:
+                self.report_request_id = report_request.id
+            generate_report_pdf(buffer if stream else file_path, country, risks, year)
         except Exception as e:
+            if buffer:
+                buffer.close()
+            pregeneration.complete_report_request(report_request, error=str(e))
             return JsonResponse({"error": str(e)}, status=500)
 
+        if stream:
+            pregeneration.complete_report_request(report_request)
+            return streaming.report_file_response(buffer, filename)
+        pregeneration.complete_report_request(report_request, file_path)
+
         return JsonResponse({
             "message": "Report generated successfully",
             "download_url": f"/reports/download/{filename}"
         })
 
 
-class DownloadReportView(APIView):
+class DownloadReportView(ProfiledViewMixin, APIView):
     permission_classes = [AllowAny]
 
+    def get_profile_report_request_id(self):
+        filename = self.kwargs.get("filename")
+        return (
+            ReportRequest.objects.filter(file_path__endswith=f"/{filename}")
+            .order_by("-created_at")
+            .values_list("id", flat=True)
+            .first()
+        )
+
     def get(self, request, filename):
         file_path = os.path.join(settings.MEDIA_ROOT, "reports", filename)
         if not os.path.exists(file_path):
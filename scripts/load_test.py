@@ -0,0 +1,92 @@
+# backend/scripts/load_test.py
+"""
+Compare la concurrence effective par worker entre les endpoints de génération
+sync (WSGI) et async (ASGI).
+
+Exemple :
+    uvicorn AfrikAI.asgi:application --workers 1 --port 8000
+    python scripts/load_test.py --base-url http://localhost:8000 --concurrency 100
+
+    gunicorn AfrikAI.wsgi:application --workers 1 --port 8001
+    python scripts/load_test.py --base-url http://localhost:8001 --concurrency 100 --only sync
+
+La "concurrence effective" est la somme des latences divisée par la durée
+totale : elle vaut ~1 pour un worker sync bloqué sur l'I/O, et tend vers
+--concurrency pour la version async.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+ENDPOINTS = {
+    "report": {"sync": "/api/report/generate", "async": "/api/report/generate/async"},
+    "podcast": {"sync": "/api/podcast/generate", "async": "/api/podcast/generate/async"},
+}
+
+
+async def _one(client, url, payload):
+    start = time.perf_counter()
+    try:
+        response = await client.post(url, json=payload)
+        ok = response.status_code == 200
+    except httpx.HTTPError:
+        ok = False
+    return ok, time.perf_counter() - start
+
+
+async def run(base_url, path, payload, requests_count, concurrency, timeout):
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        async def bounded():
+            async with semaphore:
+                return await _one(client, path, payload)
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(bounded() for _ in range(requests_count)))
+        wall = time.perf_counter() - start
+
+    latencies = sorted(latency for _, latency in results)
+    return {
+        "ok": sum(1 for ok, _ in results if ok),
+        "total": len(results),
+        "wall": wall,
+        "throughput": len(results) / wall if wall else 0.0,
+        "p50": statistics.median(latencies),
+        "p95": latencies[int(0.95 * (len(latencies) - 1))],
+        "concurrency": sum(latencies) / wall if wall else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--kind", choices=ENDPOINTS.keys(), default="report")
+    parser.add_argument("--only", choices=["sync", "async"])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--timeout", type=float, default=600)
+    parser.add_argument("--country", default="Kenya")
+    parser.add_argument("--risks", default="climate,financial")
+    parser.add_argument("--year", type=int, default=2025)
+    args = parser.parse_args()
+
+    payload = {"country": args.country, "risks": args.risks.split(","), "year": args.year}
+    modes = [args.only] if args.only else ["sync", "async"]
+
+    for mode in modes:
+        path = ENDPOINTS[args.kind][mode]
+        stats = asyncio.run(run(args.base_url, path, payload, args.requests, args.concurrency, args.timeout))
+        print(
+            f"[{mode:5}] {path}: {stats['ok']}/{stats['total']} OK en {stats['wall']:.1f}s | "
+            f"{stats['throughput']:.2f} req/s | p50 {stats['p50']:.2f}s | p95 {stats['p95']:.2f}s | "
+            f"concurrence effective {stats['concurrency']:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,10 @@
 # backend/services/podcast_generator.py
 import os
-import requests
+import asyncio
+import httpx
 from datetime import datetime
 from dotenv import load_dotenv
+from services import tts_segments
 from services.text_podcast import PodcastService  # ✅ corrigé l'import
 
 # Charger les variables d'environnement depuis .env
@@ -19,55 +21,101 @@ MEDIA_DIR = os.path.join(BASE_DIR, "media")
 PODCAST_DIR = os.path.join(MEDIA_DIR, "podcast")
 TEXT_DIR = os.path.join(MEDIA_DIR, "texts")
 
+ELEVENLABS_URL = f"https://api.elevenlabs.io/v1/text-to-speech/{VOICE_ID}"
+ELEVENLABS_TIMEOUT = float(os.getenv("ELEVENLABS_TIMEOUT", "300"))
+
 # Crée les dossiers si absents
 os.makedirs(PODCAST_DIR, exist_ok=True)
 os.makedirs(TEXT_DIR, exist_ok=True)
 
 
+def _read_text(path: str) -> str:
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def _write_copy(text: str, path: str):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def _write_audio(content: bytes, path: str):
+    with open(path, "wb") as f:
+        f.write(content)
+
+
 def generate_podcast(country: str, risks: list[str], year: int, title: str = "podcast"):
     """
     Génère un podcast audio (mp3) dans backend/media/podcast
     et sauvegarde le texte dans backend/media/texts
     """
+    text, text_filename = generate_podcast_script(country, risks, year, title)
+    return synthesize_podcast(text, text_filename), text_filename
 
-    # 1. Générer le script journalistique avec Groq
+
+def generate_podcast_script(country: str, risks: list[str], year: int, title: str = "podcast"):
+    """
+    Étape 1 : script journalistique Groq, copié dans media/texts/<title>_<date>.txt.
+    Retourne (texte, chemin de la copie).
+    """
     print(f"🎙️ Génération du script pour {country}, année {year}, risques: {', '.join(risks)}...")
     text_path = PodcastService.generate_podcast_text(country, risks, year)
+    text = _read_text(text_path)
 
-    # Lire le contenu du fichier texte généré
-    with open(text_path, "r", encoding="utf-8") as f:
-        text = f.read()
-
-    # Créer un nouveau nom de fichier basé sur l'heure
+    # Copie horodatée du texte pour traçabilité ; le mp3 portera le même nom
     date_str = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-
-    # Sauvegarde une copie du texte pour traçabilité
     text_filename = os.path.join(TEXT_DIR, f"{title}_{date_str}.txt")
-    with open(text_filename, "w", encoding="utf-8") as f:
-        f.write(text)
+    _write_copy(text, text_filename)
+    return text, text_filename
+
+
+def tts_calls_needed(text: str) -> int:
+    """
+    Appels ElevenLabs nécessaires pour ce script (segments absents du cache TTS).
+    """
+    return tts_segments.calls_needed(text, VOICE_ID)
 
-    # 2. Convertir en audio via ElevenLabs
-    mp3_filename = os.path.join(PODCAST_DIR, f"{title}_{date_str}.mp3")
-    url = f"https://api.elevenlabs.io/v1/text-to-speech/{VOICE_ID}"
-    headers = {
-        "xi-api-key": ELEVENLABS_API_KEY,
-        "Content-Type": "application/json"
-    }
-    data = {
-        "text": text
-    }
+
+def synthesize_podcast(text: str, text_filename: str, max_calls: int | None = None) -> str:
+    """
+    Étape 2 : convertit le script en audio via ElevenLabs (segments déjà
+    synthétisés servis depuis le cache). Retourne le chemin du mp3.
+    """
+    mp3_filename = os.path.join(PODCAST_DIR, os.path.splitext(os.path.basename(text_filename))[0] + ".mp3")
 
     print("🔊 Conversion du texte en audio avec ElevenLabs...")
-    response = requests.post(url, json=data, headers=headers)
-
-    if response.status_code == 200:
-        with open(mp3_filename, "wb") as f:
-            f.write(response.content)
-        print(f"✅ Podcast généré : {mp3_filename}")
-        return mp3_filename, text_filename
-    else:
-        print(f"❌ Erreur {response.status_code} : {response.text}")
-        raise RuntimeError(f"Erreur ElevenLabs: {response.text}")
+    audio = tts_segments.synthesize(text, VOICE_ID, ELEVENLABS_API_KEY, ELEVENLABS_URL,
+                                    timeout=ELEVENLABS_TIMEOUT, max_calls=max_calls)
+
+    _write_audio(audio, mp3_filename)
+    print(f"✅ Podcast généré : {mp3_filename}")
+    return mp3_filename
+
+
+async def agenerate_podcast(country: str, risks: list[str], year: int, title: str = "podcast"):
+    """
+    Version async de generate_podcast : les appels Groq et ElevenLabs
+    n'occupent pas de worker pendant l'attente réseau.
+    """
+    print(f"🎙️ Génération du script pour {country}, année {year}, risques: {', '.join(risks)}...")
+    async with httpx.AsyncClient() as client:
+        text_path = await PodcastService.agenerate_podcast_text(country, risks, year, client=client)
+
+        text = await asyncio.to_thread(_read_text, text_path)
+
+        date_str = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        text_filename = os.path.join(TEXT_DIR, f"{title}_{date_str}.txt")
+        await asyncio.to_thread(_write_copy, text, text_filename)
+
+        mp3_filename = os.path.join(PODCAST_DIR, f"{title}_{date_str}.mp3")
+
+        print("🔊 Conversion du texte en audio avec ElevenLabs...")
+        audio = await tts_segments.asynthesize(text, VOICE_ID, ELEVENLABS_API_KEY, ELEVENLABS_URL,
+                                               client, timeout=ELEVENLABS_TIMEOUT)
+
+    await asyncio.to_thread(_write_audio, audio, mp3_filename)
+    print(f"✅ Podcast généré : {mp3_filename}")
+    return mp3_filename, text_filename
 
 
 def main():
@@ -1,6 +1,12 @@
 # backend/services/report_service.py
+import io
 import os
+import atexit
+import asyncio
+import multiprocessing
+import httpx
 import requests
+from concurrent.futures import ProcessPoolExecutor
 from dotenv import load_dotenv
 from datetime import datetime
 from reportlab.lib.pagesizes import A4
@@ -16,17 +22,38 @@ if not API_KEY:
 # API Groq
 GROQ_URL = "https://api.groq.com/openai/v1/chat/completions"
 HEADERS = {"Authorization": f"Bearer {API_KEY}"}
+GROQ_TIMEOUT = float(os.getenv("GROQ_TIMEOUT", "120"))
 
+# Le rendu reportlab est CPU-bound : en async on le déporte dans un pool de process
+# pour ne pas bloquer la boucle d'événements. "spawn" plutôt que fork : le worker
+# ASGI a déjà des threads (asgiref) qu'un fork pourrait laisser verrouillés.
+RENDER_WORKERS = int(os.getenv("REPORT_RENDER_WORKERS", os.cpu_count() or 1))
+_render_executor = None
 
-def generate_text(prompt: str) -> str:
-    """
-    Génère du texte via l'API Groq.
-    """
-    data = {
+
+def _get_render_executor():
+    global _render_executor
+    if _render_executor is None:
+        _render_executor = ProcessPoolExecutor(
+            max_workers=RENDER_WORKERS, mp_context=multiprocessing.get_context("spawn")
+        )
+        atexit.register(_render_executor.shutdown, wait=False, cancel_futures=True)
+    return _render_executor
+
+
+def _groq_payload(prompt: str) -> dict:
+    return {
         "model": "llama-3.3-70b-versatile",  # ou "llama3-70b-8192-compat" si disponible
         "messages": [{"role": "user", "content": prompt}],
         "max_tokens": 700
     }
+
+
+def generate_text(prompt: str) -> str:
+    """
+    Génère du texte via l'API Groq.
+    """
+    data = _groq_payload(prompt)
     try:
         response = requests.post(GROQ_URL, headers=HEADERS, json=data)
         if response.status_code != 200:
@@ -36,14 +63,97 @@ def generate_text(prompt: str) -> str:
         raise RuntimeError(f"Erreur génération texte Groq: {str(e)}") from e
 
 
-def generate_report_pdf(file_path: str, country: str, risks: list, year: int):
+async def agenerate_text(prompt: str, client: httpx.AsyncClient) -> str:
+    """
+    Version async de generate_text, via un client httpx partagé.
+    """
+    data = _groq_payload(prompt)
+    try:
+        response = await client.post(GROQ_URL, headers=HEADERS, json=data, timeout=GROQ_TIMEOUT)
+        if response.status_code != 200:
+            raise RuntimeError(f"Erreur API Groq: {response.text}")
+        return response.json()["choices"][0]["message"]["content"]
+    except Exception as e:
+        raise RuntimeError(f"Erreur génération texte Groq: {str(e)}") from e
+
+
+def build_risk_prompt(country: str, risk: str, year: int) -> str:
+    return (
+        f"Rédige un rapport structuré façon Allianz sur le risque '{risk}' en {country} pour {year}. "
+        f"Structure le texte en 3 parties claires avec titres en majuscules :\n"
+        f"1. CONTEXTE ET TENDANCES\n"
+        f"2. IMPACT SUR LES ENTREPRISES\n"
+        f"3. RECOMMANDATIONS ET MITIGATION\n"
+        f"Utilise un ton professionnel, analytique et synthétique."
+    )
+
+
+def generate_report_pdf(file_path, country: str, risks: list, year: int):
     """
     Génère un PDF Allianz-style :
     - Page de garde
     - 1 risque = 1 page
     - Structure : Contexte / Impact / Recommandations
+    file_path peut être un chemin ou un fichier binaire déjà ouvert (buffer mémoire).
+    """
+    sections = []
+    for risk in risks:
+        try:
+            content = generate_text(build_risk_prompt(country, risk, year))
+        except RuntimeError as e:
+            print(f"Erreur génération contenu pour '{risk}': {e}")
+            content = f"⚠️ Erreur génération contenu pour le risque '{risk}': {e}"
+        sections.append((risk, content))
+
+    return render_report_pdf(file_path, country, sections, year)
+
+
+async def agenerate_report_pdf(file_path, country: str, risks: list, year: int):
     """
-    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    Version async de generate_report_pdf : les appels Groq sont lancés en
+    parallèle, puis le rendu PDF est exécuté dans le pool de process.
+    Avec un buffer, le worker renvoie le PDF entier en octets : le pic mémoire
+    est d'une copie complète du rapport (le tampon ne déborde sur disque
+    qu'ensuite, au-delà de REPORT_STREAM_SPOOL_MAX_SIZE).
+    """
+    async def section(client, risk):
+        try:
+            content = await agenerate_text(build_risk_prompt(country, risk, year), client)
+        except RuntimeError as e:
+            print(f"Erreur génération contenu pour '{risk}': {e}")
+            content = f"⚠️ Erreur génération contenu pour le risque '{risk}': {e}"
+        return risk, content
+
+    async with httpx.AsyncClient() as client:
+        sections = await asyncio.gather(*(section(client, risk) for risk in risks))
+
+    loop = asyncio.get_running_loop()
+    if isinstance(file_path, str):
+        return await loop.run_in_executor(
+            _get_render_executor(), render_report_pdf, file_path, country, list(sections), year
+        )
+
+    # Un buffer ne traverse pas la frontière de process : on récupère les octets.
+    content = await loop.run_in_executor(
+        _get_render_executor(), render_report_bytes, country, list(sections), year
+    )
+    # Le tampon peut déborder sur disque : l'écriture ne doit pas bloquer la boucle.
+    await asyncio.to_thread(file_path.write, content)
+    return file_path
+
+
+def render_report_bytes(country: str, sections: list, year: int) -> bytes:
+    buffer = io.BytesIO()
+    render_report_pdf(buffer, country, sections, year)
+    return buffer.getvalue()
+
+
+def render_report_pdf(file_path, country: str, sections: list, year: int):
+    """
+    Rendu reportlab du rapport à partir des sections (risque, contenu) déjà générées.
+    """
+    if isinstance(file_path, str):
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
 
     c = canvas.Canvas(file_path, pagesize=A4)
     width, height = A4
@@ -59,21 +169,7 @@ def generate_report_pdf(file_path: str, country: str, risks: list, year: int):
     c.showPage()
 
     # === Une page par risque ===
-    for risk in risks:
-        prompt = (
-            f"Rédige un rapport structuré façon Allianz sur le risque '{risk}' en {country} pour {year}. "
-            f"Structure le texte en 3 parties claires avec titres en majuscules :\n"
-            f"1. CONTEXTE ET TENDANCES\n"
-            f"2. IMPACT SUR LES ENTREPRISES\n"
-            f"3. RECOMMANDATIONS ET MITIGATION\n"
-            f"Utilise un ton professionnel, analytique et synthétique."
-        )
-        try:
-            content = generate_text(prompt)
-        except RuntimeError as e:
-            print(f"Erreur génération contenu pour '{risk}': {e}")
-            content = f"⚠️ Erreur génération contenu pour le risque '{risk}': {e}"
-
+    for risk, content in sections:
         # === Titre de la page ===
         c.setFont("Helvetica-Bold", 16)
         c.drawCentredString(width / 2, height - 2 * cm, risk.upper())
@@ -94,5 +190,6 @@ def generate_report_pdf(file_path: str, country: str, risks: list, year: int):
         c.showPage()
 
     c.save()
-    print(f"=== PDF généré: {file_path} ===")
+    if isinstance(file_path, str):
+        print(f"=== PDF généré: {file_path} ===")
     return file_path
@@ -0,0 +1,132 @@
+# backend/services/tests.py
+import json
+import os
+import tempfile
+from unittest import mock
+
+import httpx
+from django.test import SimpleTestCase
+
+from . import tts_segments
+
+
+class SegmentScriptTests(SimpleTestCase):
+    def test_splits_voice_block_on_breaks_and_paragraphs(self):
+        script = (
+            '<voice emotion="serious">Intro.\n\nSuite. <break time="500ms"/> Fin.</voice>\n'
+            '<voice emotion="warm">Merci.</voice>'
+        )
+        self.assertEqual(tts_segments.segment_script(script), [
+            '<voice emotion="serious">Intro.</voice>',
+            '<voice emotion="serious">Suite.</voice> <break time="500ms"/>',
+            '<voice emotion="serious">Fin.</voice>',
+            '<voice emotion="warm">Merci.</voice>',
+        ])
+
+    def test_leading_break_is_attached_to_first_segment(self):
+        segments = tts_segments.segment_script('<break time="1s"/>\n\nBonjour.')
+        self.assertEqual(segments, ['<break time="1s"/> Bonjour.'])
+
+    def test_tag_only_segments_are_skipped(self):
+        script = '<voice emotion="calm">\n\n</voice><break time="1s"/>\n\n<emphasis></emphasis>\n\nTexte.'
+        self.assertEqual(tts_segments.segment_script(script), ['<break time="1s"/> Texte.'])
+
+    def test_editing_one_paragraph_changes_one_key(self):
+        before = tts_segments.segment_script('<voice emotion="calm">Un.\n\nDeux.\n\nTrois.</voice>')
+        after = tts_segments.segment_script('<voice emotion="calm">Un.\n\nDeux bis.\n\nTrois.</voice>')
+        keys_before = {tts_segments.segment_key("v", s) for s in before}
+        keys_after = {tts_segments.segment_key("v", s) for s in after}
+        self.assertEqual(len(keys_before & keys_after), 2)
+
+
+class SegmentKeyTests(SimpleTestCase):
+    def test_key_ignores_whitespace(self):
+        self.assertEqual(tts_segments.segment_key("v", "a  b\n"), tts_segments.segment_key("v", " a b"))
+
+    def test_key_depends_on_voice_id_and_attributes(self):
+        key = tts_segments.segment_key("v", '<voice emotion="calm">a</voice>')
+        self.assertNotEqual(key, tts_segments.segment_key("w", '<voice emotion="calm">a</voice>'))
+        self.assertNotEqual(key, tts_segments.segment_key("v", '<voice emotion="warm">a</voice>'))
+
+
+class SegmentCacheTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        patcher = mock.patch.object(tts_segments, "TTS_CACHE_DIR", tmp.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache_dir = tmp.name
+
+    def _fake_session(self):
+        session = mock.MagicMock()
+        session.__enter__.return_value = session
+        session.post.side_effect = lambda url, json, **kwargs: mock.Mock(
+            status_code=200, content=json["text"].encode("utf-8"))
+        return session
+
+    def test_only_missing_segments_are_synthesized(self):
+        session = self._fake_session()
+        with mock.patch.object(tts_segments.requests, "Session", return_value=session):
+            audio = tts_segments.synthesize("Un.\n\nDeux.\n\nUn.", "v", "key", "http://tts")
+            self.assertEqual(audio, "Un.Deux.Un.".encode("utf-8"))
+            self.assertEqual(session.post.call_count, 2)
+
+            tts_segments.synthesize("Un.\n\nTrois.", "v", "key", "http://tts")
+            self.assertEqual(session.post.call_count, 3)
+
+    def test_hits_survive_concurrent_eviction(self):
+        tts_segments._store(tts_segments.segment_key("v", "Un."), b"UN")
+        session = self._fake_session()
+
+        def post_and_evict(url, json, **kwargs):
+            # Une autre requête vide le cache pendant l'appel ElevenLabs
+            for name in os.listdir(self.cache_dir):
+                os.remove(os.path.join(self.cache_dir, name))
+            return mock.Mock(status_code=200, content=json["text"].encode("utf-8"))
+
+        session.post.side_effect = post_and_evict
+        with mock.patch.object(tts_segments.requests, "Session", return_value=session):
+            audio = tts_segments.synthesize("Un.\n\nDeux.", "v", "key", "http://tts")
+        self.assertEqual(audio, "UNDeux.".encode("utf-8"))
+
+    def test_max_calls_is_checked_before_any_call(self):
+        session = self._fake_session()
+        with mock.patch.object(tts_segments.requests, "Session", return_value=session):
+            with self.assertRaises(tts_segments.TTSBudgetExceeded):
+                tts_segments.synthesize("Un.\n\nDeux.", "v", "key", "http://tts", max_calls=1)
+        session.post.assert_not_called()
+        self.assertEqual(tts_segments.calls_needed("Un.\n\nDeux.", "v"), 2)
+
+    async def test_asynthesize_fetches_missing_segments_concurrently(self):
+        tts_segments._store(tts_segments.segment_key("v", "Un."), b"UN")
+        requests_seen = []
+
+        def handle(request):
+            requests_seen.append(request)
+            return httpx.Response(200, content=json.loads(request.content)["text"].encode("utf-8"))
+
+        script = "Un.\n\nDeux.\n\nTrois.\n\nDeux."
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handle)) as client:
+            audio = await tts_segments.asynthesize(script, "v", "key", "http://tts", client)
+            self.assertEqual(audio, "UNDeux.Trois.Deux.".encode("utf-8"))
+            self.assertEqual(len(requests_seen), 2)  # "Deux." une seule fois, "Un." en cache
+
+            await tts_segments.asynthesize(script, "v", "key", "http://tts", client)
+            self.assertEqual(len(requests_seen), 2)
+
+    async def test_asynthesize_raises_on_upstream_error(self):
+        async with httpx.AsyncClient(transport=httpx.MockTransport(lambda r: httpx.Response(401))) as client:
+            with self.assertRaises(RuntimeError):
+                await tts_segments.asynthesize("Un.", "v", "key", "http://tts", client)
+        self.assertEqual(os.listdir(self.cache_dir), [])
+
+    def test_eviction_removes_least_recently_used(self):
+        for index, key in enumerate(["old", "mid", "new"]):
+            tts_segments._store(key, b"x" * 10)
+            os.utime(tts_segments._cache_path(key), (index, index))
+
+        with mock.patch.object(tts_segments, "TTS_CACHE_MAX_BYTES", 20):
+            tts_segments._evict()
+
+        self.assertEqual(sorted(os.listdir(self.cache_dir)), ["mid.mp3", "new.mp3"])
@@ -3,13 +3,17 @@
 
 # Use Groq API for podcast text generation (like report_service)
 import os
+import asyncio
+import httpx
 import requests
+from datetime import datetime
 from dotenv import load_dotenv
 
 load_dotenv()
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 GROQ_URL = "https://api.groq.com/openai/v1/chat/completions"
 HEADERS = {"Authorization": f"Bearer {GROQ_API_KEY}"}
+GROQ_TIMEOUT = float(os.getenv("GROQ_TIMEOUT", "120"))
 
 BASE_DIR = os.path.dirname(os.path.dirname(__file__))
 MEDIA_DIR = os.path.join(BASE_DIR, "media")
@@ -23,10 +27,9 @@ class PodcastService:
     """
 
     @staticmethod
-    def generate_podcast_text(country: str, risks: list[str], year: int, tone: str = "serious", title: str = "podcast") -> str:
+    def build_prompt(country: str, risks: list[str], year: int, tone: str = "serious") -> dict:
         """
-        Generate a journalist-style podcast script and save to media/texts.
-        Returns the file path of the saved text.
+        Build the Groq chat-completion payload for a podcast script.
         """
         risks_text = ", ".join(risks)
         prompt = f"""
@@ -54,11 +57,30 @@ class PodcastService:
 
         Write a full podcast script in French.
         """
-        data = {
+        return {
             "model": "llama-3.3-70b-versatile",
             "messages": [{"role": "user", "content": prompt}],
             "max_tokens": 1200
         }
+
+    @staticmethod
+    def save_text(content: str, title: str = "podcast") -> str:
+        """
+        Save a podcast script to media/texts and return its path.
+        """
+        date_str = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        text_filename = os.path.join(TEXT_DIR, f"{title}_{date_str}.txt")
+        with open(text_filename, "w", encoding="utf-8") as f:
+            f.write(content)
+        return text_filename
+
+    @staticmethod
+    def generate_podcast_text(country: str, risks: list[str], year: int, tone: str = "serious", title: str = "podcast") -> str:
+        """
+        Generate a journalist-style podcast script and save to media/texts.
+        Returns the file path of the saved text.
+        """
+        data = PodcastService.build_prompt(country, risks, year, tone)
         try:
             response = requests.post(GROQ_URL, headers=HEADERS, json=data)
             if response.status_code != 200:
@@ -67,12 +89,26 @@ class PodcastService:
         except Exception as e:
             content = f"⚠️ Erreur génération contenu podcast: {e}"
 
-        # Save to txt file in media/texts
-        from datetime import datetime
-        date_str = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-        text_filename = os.path.join(TEXT_DIR, f"{title}_{date_str}.txt")
-        with open(text_filename, "w", encoding="utf-8") as f:
-            f.write(content)
-        return text_filename
+        return PodcastService.save_text(content, title)
 
+    @staticmethod
+    async def agenerate_podcast_text(country: str, risks: list[str], year: int, tone: str = "serious",
+                                     title: str = "podcast", client: httpx.AsyncClient | None = None) -> str:
+        """
+        Async variant of generate_podcast_text; does not block the event loop
+        while waiting on Groq.
+        """
+        data = PodcastService.build_prompt(country, risks, year, tone)
+        try:
+            if client is None:
+                async with httpx.AsyncClient() as own_client:
+                    response = await own_client.post(GROQ_URL, headers=HEADERS, json=data, timeout=GROQ_TIMEOUT)
+            else:
+                response = await client.post(GROQ_URL, headers=HEADERS, json=data, timeout=GROQ_TIMEOUT)
+            if response.status_code != 200:
+                raise RuntimeError(f"Erreur API Groq: {response.text}")
+            content = response.json()["choices"][0]["message"]["content"]
+        except Exception as e:
+            content = f"⚠️ Erreur génération contenu podcast: {e}"
 
+        return await asyncio.to_thread(PodcastService.save_text, content, title)
@@ -0,0 +1,216 @@
+# backend/services/tts_segments.py
+"""
+Cache audio ElevenLabs au niveau du segment.
+
+Le script podcast est découpé sur le balisage demandé par PodcastService :
+à l'intérieur comme à l'extérieur des blocs <voice>, chaque <break .../> et
+chaque saut de paragraphe (ligne vide) termine un segment. Un segment pris
+dans un bloc <voice> est ré-enveloppé avec les attributs de ce bloc, et un
+<break/> reste accroché au segment qui le précède (ElevenLabs l'interprète
+lui-même). L'audio de chaque segment est mis en cache sous
+hash(voice_id, segment normalisé) ; seuls les segments absents du cache sont
+synthétisés, puis les MP3 sont concaténés.
+
+Le cache vit hors de MEDIA_ROOT (non servi publiquement) et est borné à
+TTS_CACHE_MAX_BYTES : les segments les moins récemment utilisés sont évincés.
+"""
+import asyncio
+import hashlib
+import os
+import re
+
+import httpx
+import requests
+
+BASE_DIR = os.path.dirname(os.path.dirname(__file__))  # backend/
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", os.path.join(BASE_DIR, "cache", "tts"))
+TTS_CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_BYTES", str(500 * 1024 * 1024)))
+TTS_CONCURRENCY = int(os.getenv("TTS_CONCURRENCY", "4"))
+os.makedirs(TTS_CACHE_DIR, exist_ok=True)
+
+_MARKUP = re.compile(r"(<voice\b[^>]*>|</voice>|<break\b[^>]*/>)")
+_PARAGRAPH = re.compile(r"\n\s*\n")
+_ANY_TAG = re.compile(r"<[^>]+>")
+_WHITESPACE = re.compile(r"\s+")
+
+
+class TTSBudgetExceeded(RuntimeError):
+    """
+    Plus de segments à synthétiser que le max_calls autorisé (aucun appel n'a été fait).
+    """
+
+
+def normalize(text: str) -> str:
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def segment_script(text: str) -> list[str]:
+    """
+    Découpe le script en segments normalisés, dans l'ordre de lecture.
+    Aucun segment ne contient que du balisage : un <break/> en tête de script
+    est accroché au premier segment parlé.
+    """
+    segments = []
+    pending_breaks = []
+    voice = None
+
+    for token in _MARKUP.split(text):
+        if not token:
+            continue
+        if token.startswith("<voice"):
+            voice = normalize(token)
+        elif token == "</voice>":
+            voice = None
+        elif token.startswith("<break"):
+            if segments:
+                segments[-1] = f"{segments[-1]} {normalize(token)}"
+            else:
+                pending_breaks.append(normalize(token))
+        else:
+            for paragraph in _PARAGRAPH.split(token):
+                body = normalize(paragraph)
+                if not _ANY_TAG.sub("", body).strip():
+                    continue
+                if voice:
+                    body = f"{voice}{body}</voice>"
+                if pending_breaks:
+                    body = " ".join(pending_breaks + [body])
+                    pending_breaks = []
+                segments.append(body)
+    return segments
+
+
+def segment_key(voice_id: str, text: str) -> str:
+    return hashlib.sha256(f"{voice_id}\n{normalize(text)}".encode("utf-8")).hexdigest()
+
+
+def _cache_path(key: str) -> str:
+    return os.path.join(TTS_CACHE_DIR, f"{key}.mp3")
+
+
+def _store(key: str, content: bytes):
+    path = _cache_path(key)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def _load(key: str) -> bytes:
+    path = _cache_path(key)
+    with open(path, "rb") as f:
+        content = f.read()
+    try:
+        os.utime(path)  # mtime = dernière utilisation, pour l'éviction LRU
+    except FileNotFoundError:
+        pass  # évincé entre-temps : les octets lus restent valables
+    return content
+
+
+def _evict():
+    """
+    Supprime les segments les moins récemment utilisés au-delà de TTS_CACHE_MAX_BYTES.
+    """
+    if not TTS_CACHE_MAX_BYTES:
+        return
+    entries = []
+    for entry in os.scandir(TTS_CACHE_DIR):
+        if entry.name.endswith(".mp3"):
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= TTS_CACHE_MAX_BYTES:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+
+
+def _lookup(voice_id: str, segments: list[str]) -> tuple[dict, dict]:
+    """
+    Sépare les segments distincts en ({clé: audio} déjà en cache, {clé: texte}
+    à synthétiser). L'audio caché est lu dès maintenant (ce qui rafraîchit son
+    mtime) : une éviction concurrente pendant les appels ElevenLabs ne peut
+    plus le faire disparaître avant l'assemblage.
+    """
+    cached, missing = {}, {}
+    for segment in segments:
+        key = segment_key(voice_id, segment)
+        if key in cached or key in missing:
+            continue
+        try:
+            cached[key] = _load(key)
+        except FileNotFoundError:
+            missing[key] = segment
+    return cached, missing
+
+
+def calls_needed(text: str, voice_id: str) -> int:
+    """
+    Nombre d'appels ElevenLabs que coûterait la synthèse du script.
+    """
+    return len(_lookup(voice_id, segment_script(text))[1])
+
+
+def _stitch(voice_id: str, segments: list[str], audio: dict) -> bytes:
+    # Les MP3 ElevenLabs (même voix, même format, sans en-tête ID3) se
+    # concatènent trame à trame sans ré-encodage.
+    return b"".join(audio[segment_key(voice_id, segment)] for segment in segments)
+
+
+def synthesize(text: str, voice_id: str, api_key: str, url: str, timeout: float = None,
+               max_calls: int | None = None) -> bytes:
+    """
+    Synthétise le script en ne faisant appel à ElevenLabs que pour les segments non cachés.
+    Avec max_calls, lève TTSBudgetExceeded avant tout appel si le script en demande plus.
+    """
+    segments = segment_script(text)
+    audio, missing = _lookup(voice_id, segments)
+    if max_calls is not None and len(missing) > max_calls:
+        raise TTSBudgetExceeded(f"{len(missing)} segments à synthétiser pour {max_calls} appels autorisés")
+    print(f"🔊 TTS : {len(missing)}/{len(segments)} segments à synthétiser")
+
+    headers = {"xi-api-key": api_key, "Content-Type": "application/json"}
+    with requests.Session() as session:
+        for key, segment in missing.items():
+            response = session.post(url, json={"text": segment}, headers=headers, timeout=timeout)
+            if response.status_code != 200:
+                print(f"❌ Erreur {response.status_code} : {response.text}")
+                raise RuntimeError(f"Erreur ElevenLabs: {response.text}")
+            _store(key, response.content)
+            audio[key] = response.content
+
+    content = _stitch(voice_id, segments, audio)
+    _evict()
+    return content
+
+
+async def asynthesize(text: str, voice_id: str, api_key: str, url: str,
+                      client: httpx.AsyncClient, timeout: float = None) -> bytes:
+    """
+    Version async de synthesize : les segments manquants sont synthétisés en
+    parallèle (au plus TTS_CONCURRENCY à la fois).
+    """
+    segments = segment_script(text)
+    audio, missing = await asyncio.to_thread(_lookup, voice_id, segments)
+    print(f"🔊 TTS : {len(missing)}/{len(segments)} segments à synthétiser")
+
+    headers = {"xi-api-key": api_key, "Content-Type": "application/json"}
+    semaphore = asyncio.Semaphore(TTS_CONCURRENCY)
+
+    async def fetch(key, segment):
+        async with semaphore:
+            response = await client.post(url, json={"text": segment}, headers=headers, timeout=timeout)
+        if response.status_code != 200:
+            print(f"❌ Erreur {response.status_code} : {response.text}")
+            raise RuntimeError(f"Erreur ElevenLabs: {response.text}")
+        await asyncio.to_thread(_store, key, response.content)
+        audio[key] = response.content
+
+    await asyncio.gather(*(fetch(key, segment) for key, segment in missing.items()))
+    content = _stitch(voice_id, segments, audio)
+    await asyncio.to_thread(_evict)
+    return content